@@ -0,0 +1,46 @@
+#Benchmark: blocks written by flattening against a raised floor, on the dry sites of generated worlds.
+#Run from the repository root with: python -m benchmarks.foundations
+import argparse
+import random
+
+import numpy as np
+
+from log_cabin.cabin import choose_cabin_design
+from log_cabin.foundation import plan_site, site_plan_blocks
+from log_cabin.generator import PAD_SIZE, VARIANCE_THRESHOLD, load_terrain, open_editor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the blocks flattening and raised foundations write")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--size", type=int, default=128)
+    parser.add_argument("--sites", type=int, default=200, help="dry sites sampled per world")
+    args = parser.parse_args()
+
+    print(f"{'seed':>5} {'sites':>6} {'rough':>6} {'flatten':>9} {'raised':>9} {'auto':>9} {'raised picked':>14}")
+    for seed in args.seeds:
+        editor = open_editor(offline=True, offline_size=(args.size, args.size), seed=seed)
+        buildRect = editor.getBuildArea().toRect()
+        terrain = load_terrain(editor, buildRect)
+        dry = np.argwhere(~terrain.rasters.get("wet"))
+        rng = random.Random(seed)
+        picked = dry[rng.sample(range(len(dry)), min(args.sites, len(dry)))]
+
+        blocks = {"flatten": [], "raised": [], "auto": []}
+        raised_picked = 0
+        rough = 0
+        for local_x, local_z in picked.tolist():
+            site = (buildRect.begin.x + local_x, buildRect.begin.y + local_z)
+            design = choose_cabin_design(PAD_SIZE, rng)
+            rough += terrain.rasters.get("variance")[local_x, local_z] >= VARIANCE_THRESHOLD
+            for foundation in blocks:
+                plan = plan_site(buildRect, terrain.heightmap, terrain.heightmap_leaves, site, design, PAD_SIZE, foundation)
+                blocks[foundation].append(site_plan_blocks(plan))
+                if foundation == "auto" and plan["foundation"] != "flatten":
+                    raised_picked += 1
+        print(f"{seed:>5} {len(picked):>6} {rough:>6} {np.mean(blocks['flatten']):>9.1f} {np.mean(blocks['raised']):>9.1f} "
+              f"{np.mean(blocks['auto']):>9.1f} {raised_picked / len(picked):>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#Benchmark and check: peak memory of the compact site search and settlement ranking per column.
+#Run from the repository root with: python -m benchmarks.memory
+#Exits with status 1 if any run goes over COMPACT_BYTES_PER_COLUMN, so it can gate a change.
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from gdpc import Rect
+
+from log_cabin.mock import synthetic_heightmap
+from log_cabin.settlement import plan_settlement
+from log_cabin.terrain import COMPACT_BYTES_PER_COLUMN, find_optimal_building_spot
+
+
+#Function which returns the peak traced bytes and seconds of one call
+def peak_memory(function, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, seconds
+
+
+#Rough terrain with water, and flat dry terrain where every window is a settlement candidate (the worst case)
+def terrains(size, seed):
+    heightmap = synthetic_heightmap(size, seed=seed)
+    yield "synthetic", heightmap, heightmap < 62
+    flat = np.full((size, size), 70)
+    flat[::5, ::3] = 71
+    yield "flat", flat, np.zeros((size, size), dtype=bool)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the compact analysis stays within its memory budget")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096])
+    parser.add_argument("--houses", type=int, default=20)
+    parser.add_argument("--full", action="store_true", help="also measure the float64 analysis for comparison")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"budget: {COMPACT_BYTES_PER_COLUMN} bytes per column ({COMPACT_BYTES_PER_COLUMN} MB per million columns)")
+    print(f"{'size':>6} {'terrain':<10} {'phase':<20} {'seconds':>8} {'peak MB':>9} {'B/column':>9}")
+    over = []
+    for size in args.sizes:
+        buildRect = Rect((0, 0), (size, size))
+        for name, heightmap, water_mask in terrains(size, args.seed):
+            runs = [
+                ("search", find_optimal_building_spot, (None, buildRect, heightmap), {"water_mask": water_mask}),
+                ("settlement", plan_settlement, (buildRect, heightmap, water_mask, args.houses), {}),
+            ]
+            for phase, function, call_args, kwargs in runs:
+                for compact in ([True, False] if args.full else [True]):
+                    peak, seconds = peak_memory(function, *call_args, compact=compact, **kwargs)
+                    per_column = peak / (size * size)
+                    label = phase if compact else f"{phase} (float64)"
+                    print(f"{size:>6} {name:<10} {label:<20} {seconds:>8.3f} {peak / 1e6:>9.1f} {per_column:>9.2f}")
+                    if compact and per_column > COMPACT_BYTES_PER_COLUMN:
+                        over.append(f"{phase} on {name} {size}: {per_column:.2f} bytes per column")
+    if over:
+        raise SystemExit("Over the compact memory budget: " + "; ".join(over))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#Benchmark: summed-area-table site search against the original per-window loop.
+#Run from the repository root with: python -m benchmarks.site_search
+import argparse
+import time
+
+import numpy as np
+from gdpc import Block, Rect
+
+from log_cabin.mock import synthetic_heightmap
+from log_cabin.cabin import FOOTPRINTS, footprint_pad
+from log_cabin.terrain import find_largest_building_spot, find_optimal_building_spot
+
+
+#Editor stand-in for the original loop, every ground block reads back as dry land
+class DryLandEditor:
+    def __init__(self):
+        self.reads = 0
+
+    def getBlock(self, position):
+        self.reads += 1
+        return Block("minecraft:grass_block")
+
+
+#The search exactly as main.py shipped it, kept here as the reference for timings and results
+def legacy_find_optimal_building_spot(editor, buildRect, heightmap, area_size=(15, 15), step_size=15):
+    optimal_coords = None
+    lowest_variance = float('inf')
+    max_x = buildRect.end.x - area_size[0] + 1
+    max_z = buildRect.end.y - area_size[1] + 1
+    for x in range(buildRect.begin.x, max_x, step_size):
+        for z in range(buildRect.begin.y, max_z, step_size):
+            heights = []
+            water_found = False
+            for xi in range(x, x + area_size[0]):
+                for zi in range(z, z + area_size[1]):
+                    local_x = xi - buildRect.begin.x
+                    local_z = zi - buildRect.begin.y
+                    if 0 <= local_x < heightmap.shape[0] and 0 <= local_z < heightmap.shape[1]:
+                        y = heightmap[local_x, local_z] - 1
+                        block = editor.getBlock((xi, y, zi))
+                        if block == Block("minecraft:water", {"level": "0"}):
+                            water_found = True
+                            break
+                        heights.append(y)
+                if water_found:
+                    break
+            if water_found or not heights:
+                continue
+            variance = np.var(heights)
+            if variance < lowest_variance:
+                lowest_variance = variance
+                optimal_coords = (x, z)
+    return optimal_coords, lowest_variance
+
+
+#Largest of several pad sizes that fits, found with one full search per size, largest first
+def per_size_largest_spot(buildRect, heightmap, water_mask, sizes, variance_threshold):
+    for index in sorted(range(len(sizes)), key=lambda index: sizes[index][0] * sizes[index][1], reverse=True):
+        coords, variance = find_optimal_building_spot(None, buildRect, heightmap, sizes[index], water_mask=water_mask)
+        if variance < variance_threshold:
+            return coords, index, variance
+    return None, None, float('inf')
+
+
+def time_call(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare site search implementations on synthetic heightmaps")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256, 1024])
+    parser.add_argument("--legacy-max-size", type=int, default=256,
+                        help="skip the original loop above this size, it needs minutes per run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--multi-threshold", type=float, default=0.3,
+                        help="variance threshold for the multi-size search over the cabin footprints' pads")
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'method':<22} {'step':>4} {'seconds':>10} {'getBlock':>10}  result")
+    for size in args.sizes:
+        heightmap = synthetic_heightmap(size, seed=args.seed)
+        buildRect = Rect((0, 0), (size, size))
+        dry = np.zeros(heightmap.shape, dtype=bool)
+
+        for step_size in (15, 1):
+            (coords, variance), seconds = time_call(
+                find_optimal_building_spot, None, buildRect, heightmap, step_size=step_size, water_mask=dry)
+            print(f"{size:>6} {'summed-area table':<22} {step_size:>4} {seconds:>10.4f} {0:>10}  {coords} var={variance:.3f}")
+
+        #Every footprint's pad from one set of sums, against a full search per pad size
+        sizes = [footprint_pad(footprint) for footprint in FOOTPRINTS]
+        results = []
+        for method, function in (("multi-size one pass", find_largest_building_spot), ("search per size", per_size_largest_spot)):
+            (coords, index, variance), seconds = time_call(function, buildRect, heightmap, dry, sizes, args.multi_threshold)
+            pad = "none" if index is None else f"{sizes[index][0]}x{sizes[index][1]}"
+            print(f"{size:>6} {method:<22} {1:>4} {seconds:>10.4f} {0:>10}  {coords} pad={pad} var={variance:.3f}")
+            results.append((coords, index))
+        if results[0] != results[1]:
+            raise SystemExit(f"Multi-size mismatch at size {size}: {results[0]} != {results[1]}")
+
+        if size <= args.legacy_max_size:
+            editor = DryLandEditor()
+            (legacy_coords, legacy_variance), seconds = time_call(
+                legacy_find_optimal_building_spot, editor, buildRect, heightmap, step_size=15)
+            print(f"{size:>6} {'original loop':<22} {15:>4} {seconds:>10.4f} {editor.reads:>10}  {legacy_coords} var={legacy_variance:.3f}")
+            coords, variance = find_optimal_building_spot(None, buildRect, heightmap, step_size=15, water_mask=dry)
+            if coords != legacy_coords or not np.isclose(variance, legacy_variance):
+                raise SystemExit(f"Result mismatch at size {size}: {coords} != {legacy_coords}")
+
+
+if __name__ == "__main__":
+    main()
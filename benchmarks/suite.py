@@ -0,0 +1,191 @@
+#Benchmark suite: site search, variance map, flattening and construction over terrain fixtures.
+#Run from the repository root with: python -m benchmarks.suite --output bench.json
+#Record the current build area of a running server as a fixture with: python -m benchmarks.suite --record area.npz
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+from gdpc import Rect
+
+from log_cabin.cabin import build_cabin_blueprint, cabin_origin, choose_cabin_design
+from log_cabin.fixtures import TerrainFixture, record_fixture, synthetic_fixture
+from log_cabin.flatten import find_minimum_edit_spot, flatten_build_area, surface_top
+from log_cabin.mock import MockEditor
+from log_cabin.rasters import TerrainRasters
+from log_cabin.tiles import find_optimal_building_spot_tiled
+from log_cabin.terrain import find_optimal_building_spot, generate_variance_map, water_mask_from_world_slice
+
+DEFAULT_SIZES = [64, 256, 1024, 4096]
+AREA_SIZE = (15, 15)
+TILE_SIZE = 256
+#Blocks of terrain kept around the chosen site when a voxel world is rebuilt for flattening
+SITE_MARGIN = 8
+
+
+#Function which runs a phase `repeat` times for timing and once more under tracemalloc for peak memory
+#setup builds fresh inputs for every run so phases that edit the world always start from the fixture
+def measure(setup, run, repeat=1, memory=True):
+    seconds = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        result = run(state)
+        seconds.append(time.perf_counter() - start)
+
+    measurement = {"seconds": min(seconds)}
+    editor = state.get("editor")
+    if editor is not None:
+        measurement["place_block_calls"] = editor.stats["block_writes"]
+        measurement["get_block_calls"] = editor.stats["block_reads"]
+        measurement["requests"] = editor.stats["requests"]
+
+    if memory:
+        state = setup()
+        tracemalloc.start()
+        run(state)
+        measurement["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return measurement, result
+
+
+#Editor stand-in that serves world slices cut from a fixture, for the tiled site search
+class FixtureEditor:
+    def __init__(self, fixture):
+        self.fixture = fixture
+
+    def loadWorldSlice(self, rect, heightmapTypes=None):
+        return self.fixture.crop(rect)
+
+
+#Function which returns a MockEditor over the part of the fixture around a site
+def site_editor(fixture, spot):
+    begin = (max(fixture.rect.begin.x, spot[0] - SITE_MARGIN), max(fixture.rect.begin.y, spot[1] - SITE_MARGIN))
+    end = (min(fixture.rect.end.x, spot[0] + AREA_SIZE[0] + SITE_MARGIN), min(fixture.rect.end.y, spot[1] + AREA_SIZE[1] + SITE_MARGIN))
+    world = fixture.to_world(Rect(begin, (end[0] - begin[0], end[1] - begin[1])))
+    return MockEditor(world, buffering=True)
+
+
+def benchmark_fixture(name, fixture, repeat=1, memory=True, legacy_max_size=4096, seed=0):
+    heightmap = fixture.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+    heightmap_leaves = surface_top(fixture.heightmaps)
+    results = []
+
+    def record(phase, measurement):
+        results.append(dict(terrain=name, size=list(heightmap.shape), phase=phase, **measurement))
+        print(f"{name:<20} {phase:<15} {measurement['seconds']:>9.4f}s"
+              + (f" {measurement['peak_bytes'] / 2**20:>9.1f} MiB" if "peak_bytes" in measurement else ""))
+
+    measurement, water_mask = measure(dict, lambda state: water_mask_from_world_slice(fixture, heightmap), repeat, memory)
+    record("water_mask", measurement)
+
+    measurement, (spot, variance) = measure(
+        dict, lambda state: find_optimal_building_spot(None, fixture.rect, heightmap, AREA_SIZE, water_mask=water_mask), repeat, memory)
+    record("site_search", measurement)
+
+    measurement, pyramid = measure(
+        dict, lambda state: find_optimal_building_spot(None, fixture.rect, heightmap, AREA_SIZE, water_mask=water_mask, pyramid=True), repeat, memory)
+    record("pyramid_search", measurement)
+    assert pyramid == (spot, variance), "pyramid site search disagrees with the full search"
+
+    measurement, tiled = measure(
+        dict, lambda state: find_optimal_building_spot_tiled(FixtureEditor(fixture), fixture.rect, AREA_SIZE, TILE_SIZE), repeat, memory)
+    record("tiled_search", measurement)
+    assert tiled == (spot, variance), "tiled site search disagrees with the whole-area search"
+
+    def edit_search(state):
+        rasters = TerrainRasters(heightmap, water_mask, AREA_SIZE, heightmap_leaves)
+        return find_minimum_edit_spot(fixture.rect, rasters)
+
+    measurement, _ = measure(dict, edit_search, repeat, memory)
+    record("edit_search", measurement)
+
+    if max(heightmap.shape) <= legacy_max_size:
+        measurement, _ = measure(dict, lambda state: generate_variance_map(fixture.rect, heightmap), repeat, memory)
+        record("variance_map", measurement)
+
+    if spot is None:
+        return results
+
+    def flatten_setup():
+        return {"editor": site_editor(fixture, spot)}
+
+    def flatten(state):
+        base_height, _ = flatten_build_area(state["editor"], fixture.rect, heightmap, spot, AREA_SIZE, heightmap_leaves=heightmap_leaves, wood_choice="spruce_planks")
+        state["editor"].flushBuffer()
+        return base_height
+
+    measurement, base_height = measure(flatten_setup, flatten, repeat, memory)
+    record("flatten", measurement)
+
+    def construction(state):
+        design = choose_cabin_design(AREA_SIZE, random.Random(seed))
+        blueprint = build_cabin_blueprint(design)
+        blueprint.write(state["editor"], cabin_origin(design, (spot[0], base_height + 1, spot[1])))
+        state["editor"].flushBuffer()
+
+    measurement, _ = measure(flatten_setup, construction, repeat, memory)
+    record("construction", measurement)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record_live_fixture(path):
+    from gdpc import Editor
+    editor = Editor()
+    worldSlice = editor.loadWorldSlice(editor.getBuildArea().toRect())
+    record_fixture(worldSlice).save(path)
+    print(f"Recorded {worldSlice.rect} to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time terrain analysis, flattening and construction without a Minecraft server")
+    parser.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES, help="synthetic terrain sizes to run")
+    parser.add_argument("--fixtures", nargs="*", default=[], help="recorded terrain .npz files to run")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--repeat", type=int, default=1, help="timing runs per phase, the fastest is reported")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run used for peak memory")
+    parser.add_argument("--legacy-max-size", type=int, default=4096, help="skip the variance map above this size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-synthetic", help="also save the synthetic fixtures to this directory")
+    parser.add_argument("--record", help="record the build area of a running GDMC server to this fixture file and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        record_live_fixture(args.record)
+        return
+
+    terrains = [(f"synthetic-{size}", lambda size=size: synthetic_fixture(size, seed=args.seed)) for size in args.sizes]
+    terrains += [(path, lambda path=path: TerrainFixture.load(path)) for path in args.fixtures]
+
+    results = []
+    for name, load in terrains:
+        fixture = load()
+        if args.save_synthetic and name.startswith("synthetic-"):
+            fixture.save(f"{args.save_synthetic}/{name}.npz")
+        results += benchmark_fixture(name, fixture, args.repeat, not args.no_memory, args.legacy_max_size, args.seed)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
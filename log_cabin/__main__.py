@@ -0,0 +1,5 @@
+import sys
+
+from log_cabin.cli import main
+
+sys.exit(main())
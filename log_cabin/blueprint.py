@@ -0,0 +1,117 @@
+import numpy as np
+from gdpc import Block
+
+from log_cabin.palette import block_from_key, block_key
+
+#Compiled form of a design: a uint16 voxel array indexing into a palette of interned blocks.
+#Index 0 means "leave the world alone", so a blueprint only writes what the design placed.
+#Blueprints are position independent, the same one can be written at any origin.
+#Every voxel also records the build stage that placed it, so stages can be written and timed separately.
+
+
+class Blueprint:
+    #offset is the local co-ordinate of voxel [0, 0, 0], so designs can overhang their origin
+    def __init__(self, size, offset=(0, 0, 0)):
+        self.offset = tuple(offset)
+        self.voxels = np.zeros(tuple(size), dtype=np.uint16)
+        self.stages = np.zeros(tuple(size), dtype=np.uint8)
+        self.stage_names = ["blocks"]
+        self._stage = 0
+        self.palette = [None]
+        self._palette_index = {}
+
+    def palette_id(self, block):
+        key = block_key(block)
+        index = self._palette_index.get(key)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(block_from_key(key))
+            self._palette_index[key] = index
+        return index
+
+    #Function which tags everything placed from now on with the named stage
+    def begin_stage(self, name):
+        if name not in self.stage_names:
+            self.stage_names.append(name)
+        self._stage = self.stage_names.index(name)
+
+    def _index(self, position):
+        return tuple(int(position[axis]) - self.offset[axis] for axis in range(3))
+
+    def place(self, position, block):
+        index = self._index(position)
+        self.voxels[index] = self.palette_id(block)
+        self.stages[index] = self._stage
+
+    #Function which fills the box between two local corners, both inclusive
+    def fill(self, first, last, block):
+        begin = self._index(first)
+        end = self._index(last)
+        region = (slice(begin[0], end[0] + 1), slice(begin[1], end[1] + 1), slice(begin[2], end[2] + 1))
+        self.voxels[region] = self.palette_id(block)
+        self.stages[region] = self._stage
+
+    def get(self, position):
+        index = self.voxels[self._index(position)]
+        return None if index == 0 else self.palette[index]
+
+    def block_count(self):
+        return int(np.count_nonzero(self.voxels))
+
+    #Function which returns the names of stages that placed at least one block, in build order
+    def used_stages(self):
+        return [self.stage_names[index] for index in np.unique(self.stages[self.voxels != 0])]
+
+    def copy(self):
+        blueprint = Blueprint(self.voxels.shape, self.offset)
+        blueprint.voxels = self.voxels.copy()
+        blueprint.stages = self.stages.copy()
+        blueprint.stage_names = list(self.stage_names)
+        blueprint.palette = list(self.palette)
+        blueprint._palette_index = dict(self._palette_index)
+        return blueprint
+
+    def save(self, file):
+        keys = [""] + [block_key(block) for block in self.palette[1:]]
+        np.savez_compressed(file, voxels=self.voxels, stages=self.stages, stage_names=np.array(self.stage_names),
+                            offset=np.array(self.offset), palette=np.array(keys))
+
+    @staticmethod
+    def load(file):
+        #Closed on the way out, long-lived workers load variants again and again
+        with np.load(file) as data:
+            blueprint = Blueprint(data["voxels"].shape, tuple(int(value) for value in data["offset"]))
+            for key in data["palette"][1:]:
+                blueprint.palette_id(block_from_key(str(key)))
+            blueprint.voxels = data["voxels"]
+            blueprint.stages = data["stages"]
+            blueprint.stage_names = [str(name) for name in data["stage_names"]]
+        return blueprint
+
+    #Function which returns the placed voxels as global co-ordinate arrays and palette indices,
+    #ordered by chunk, then by block, then by position. stage limits it to one named stage.
+    def placements(self, origin=(0, 0, 0), stage=None):
+        placed = self.voxels != 0
+        if stage is not None:
+            placed &= self.stages == self.stage_names.index(stage)
+        local_x, local_y, local_z = np.nonzero(placed)
+        ids = self.voxels[local_x, local_y, local_z]
+        x = local_x + self.offset[0] + origin[0]
+        y = local_y + self.offset[1] + origin[1]
+        z = local_z + self.offset[2] + origin[2]
+        order = np.lexsort((y, z, x, ids, z >> 4, x >> 4))
+        return x[order], y[order], z[order], ids[order]
+
+    #Function which writes the blueprint to the editor at origin, one bulk placeBlock per block
+    #type in each chunk. Returns the number of blocks written.
+    def write(self, editor, origin=(0, 0, 0), stage=None):
+        x, y, z, ids = self.placements(origin, stage)
+        if len(ids) == 0:
+            return 0
+        chunk_x, chunk_z = x >> 4, z >> 4
+        breaks = np.nonzero((np.diff(ids) != 0) | (np.diff(chunk_x) != 0) | (np.diff(chunk_z) != 0))[0] + 1
+        for start, end in zip(np.r_[0, breaks], np.r_[breaks, len(ids)]):
+            positions = list(zip(x[start:end].tolist(), y[start:end].tolist(), z[start:end].tolist()))
+            block = self.palette[ids[start]]
+            editor.placeBlock(positions, Block(block.id, dict(block.states)))
+        return len(ids)
@@ -0,0 +1,235 @@
+import random
+from collections import namedtuple
+
+from gdpc import Block
+
+from log_cabin.blueprint import Blueprint
+
+#Log cabin generator.
+#choose_cabin_design makes every random choice up front, build_cabin_blueprint turns a design
+#into a Blueprint without touching the world. Blueprint co-ordinates are local to the house:
+#the south-west corner of the walls on the floor is (0, 0, 0) and the roof overhangs by one block.
+
+WALL_HEIGHT_OPTIONS = [5, 7] #Possible heights for house
+LENGTH_OPTIONS = [6, 7]  # Possible lengths x or z dimension of house
+WIDTH = 9  # Always same width for the alternate dimension
+ROOF_OPTIONS = ["deepslate_brick_stairs", "polished_diorite_stairs", "brick_stairs"]
+PLATEAU_OPTIONS = ["polished_diorite_slab", "deepslate_brick_slab"]
+BED_COLOUR_OPTIONS = ["white_bed", "black_bed", "red_bed", "blue_bed", "lime_bed"]
+SLOPE_HEIGHT_INCREASE_PER_BLOCK = 1
+
+#Smallest cabin the roof, doors, windows and furniture still fit in
+MIN_LENGTH = 4
+MIN_WIDTH = 6
+MIN_WALL_HEIGHT = 3
+#Cabin footprints as (length, width), smallest first, for a search that picks the largest one a site fits
+FOOTPRINTS = [(5, 6), (7, 9), (9, 11), (11, 13)]
+#Blocks of pad around the largest side of a cabin, either orientation fits on its square pad
+PAD_MARGIN = 3
+
+#orientation is True when the length runs along the x-axis
+#offset is where the house starts inside the pad, bed_at_start picks the end wall for the bed,
+#lantern is the cross-axis position of the ridge lantern and furniture holds the cross-axis
+#positions of the crafting table, furnace and chest
+CabinDesign = namedtuple("CabinDesign", [
+    "orientation", "length", "width", "wall_height", "offset",
+    "roof_type", "plateau", "lantern", "bed_colour", "bed_at_start", "furniture",
+])
+
+
+#Function which returns the square pad a cabin of footprint (length, width) is built on
+def footprint_pad(footprint):
+    side = max(footprint) + 2 * PAD_MARGIN
+    return (side, side)
+
+
+#Function which raises ValueError for a cabin too small to hold its doors, windows and furniture
+def check_cabin_size(footprint=None, wall_height=None):
+    if footprint is not None and (footprint[0] < MIN_LENGTH or footprint[1] < MIN_WIDTH):
+        raise ValueError(f"A cabin needs a length of at least {MIN_LENGTH} and a width of at least {MIN_WIDTH}, "
+                         f"not {footprint[0]}x{footprint[1]}")
+    if wall_height is not None and wall_height < MIN_WALL_HEIGHT:
+        raise ValueError(f"A cabin needs walls at least {MIN_WALL_HEIGHT} high, not {wall_height}")
+
+
+#Function which makes all random choices for a cabin that fits on a pad of pad_size
+#footprint (length, width) and wall_height fix the cabin's size, otherwise they are drawn from the options
+#Draws happen in the same order the original script made them
+def choose_cabin_design(pad_size=(15, 15), rng=random, footprint=None, wall_height=None):
+    orientation = rng.choice([True, False]) #Chooses randomly if house is oriented along x or z axis
+    length, width = (rng.choice(LENGTH_OPTIONS), WIDTH) if footprint is None else footprint
+    if wall_height is None:
+        wall_height = rng.choice(WALL_HEIGHT_OPTIONS)
+    check_cabin_size((length, width), wall_height)
+    size_x, size_z = (length, width) if orientation else (width, length)
+    if size_x > pad_size[0] or size_z > pad_size[1]:
+        raise ValueError(f"A {size_x}x{size_z} cabin does not fit on a {pad_size[0]}x{pad_size[1]} pad")
+    offset = (rng.randint(0, pad_size[0] - size_x), rng.randint(0, pad_size[1] - size_z))
+
+    roof_type = rng.choice(ROOF_OPTIONS)
+    plateau = rng.choice(PLATEAU_OPTIONS)
+    lantern = rng.randint(2, width - 2)
+    bed_colour = rng.choice(BED_COLOUR_OPTIONS)
+    bed_at_start = rng.choice([True, False])
+
+    #Crafting table, furnace and chest each get a distinct spot along the wall opposite the bed
+    furniture = []
+    for _ in range(3):
+        position = rng.randint(2, width - 2)
+        while position in furniture:
+            position = rng.randint(2, width - 2)
+        furniture.append(position)
+
+    return CabinDesign(orientation, length, width, wall_height, offset,
+                       roof_type, plateau, lantern, bed_colour, bed_at_start, tuple(furniture))
+
+
+#Function to get the correct way for stairs to face based on orientation
+def get_stair_facing(x, z, midpoint, orientation):
+    facing_direction = None
+    if orientation:  # Length along x-axis
+        if x < midpoint:  # Ascending
+            facing_direction = "east"
+        elif x > midpoint:  # Descending
+            facing_direction = "west"
+    else:  # Length along z-axis
+        if z < midpoint:  # Ascending
+            facing_direction = "south"
+        elif z > midpoint:  # Descending
+            facing_direction = "north"
+
+    return facing_direction
+
+
+#Function to determine how high each roof block should be based on its given position
+def calculate_slope_height(position, start_point, max_height, midpoint, even_dimension, slope_height_increase_per_block=SLOPE_HEIGHT_INCREASE_PER_BLOCK):
+    if even_dimension:
+        if position < midpoint:
+            return (position - start_point) * slope_height_increase_per_block
+        else:
+            return ((max_height - (position - midpoint) * slope_height_increase_per_block)-1)
+    else:
+        if position < midpoint:
+            return (position - start_point) * slope_height_increase_per_block
+        else:
+            return max_height - (position - midpoint) * slope_height_increase_per_block
+
+
+#Function to determine which direction door should face based on the orientation
+def find_door_positions(start_x, start_z, length, orientation, wall_height):
+    door_positions = []
+
+    if orientation:  # Wall runs along the x-axis
+        middle_x = start_x + length // 2  # Middle for both even and odd widths
+        if length % 2 == 0:  # Adjust for even width to move one step left
+            middle_x -= 1
+
+        # Positions for the bottom two rows in the middle of the wall
+        for y_offset in range(2):  # Door height
+            door_positions.append((middle_x, start_z, wall_height + y_offset))
+            if length % 2 == 0:  # For even widths, add a second door
+                door_positions.append((middle_x + 1, start_z, wall_height + y_offset))
+
+    else:  # Wall runs along the z-axis
+        middle_z = start_z + length // 2  # Middle for both even and odd widths
+        if length % 2 == 0:  # Adjust for even width to move one step up
+            middle_z -= 1
+
+        # Positions for the bottom two rows in the middle of the wall
+        for y_offset in range(2):  # Door height
+            door_positions.append((start_x, middle_z, wall_height + y_offset))
+            if length % 2 == 0:  # For even widths, add a second door
+                door_positions.append((start_x, middle_z + 1, wall_height + y_offset))
+
+    return door_positions
+
+
+#Function which returns (x, y, z) for a point given along the length axis and across it
+def _along(design, along, y, across):
+    return (along, y, across) if design.orientation else (across, y, along)
+
+
+def build_cabin_blueprint(design, slope_height_increase_per_block=SLOPE_HEIGHT_INCREASE_PER_BLOCK):
+    orientation = design.orientation
+    length = design.length
+    wall_height = design.wall_height
+    size_x, size_z = cabin_footprint(design)
+    even_dimension = length % 2 == 0
+    midpoint = length // 2
+    max_slope_height = midpoint * slope_height_increase_per_block
+
+    blueprint = Blueprint((size_x + 2, wall_height + max_slope_height + 3, size_z + 2), offset=(-1, 0, -1))
+
+    #Walls, then log pillars on each corner of house
+    blueprint.begin_stage("walls")
+    wall = Block("spruce_planks")
+    blueprint.fill((0, 0, 0), (size_x - 1, wall_height - 1, 0), wall)
+    blueprint.fill((0, 0, size_z - 1), (size_x - 1, wall_height - 1, size_z - 1), wall)
+    blueprint.fill((0, 0, 0), (0, wall_height - 1, size_z - 1), wall)
+    blueprint.fill((size_x - 1, 0, 0), (size_x - 1, wall_height - 1, size_z - 1), wall)
+    for x, z in ((0, 0), (0, size_z - 1), (size_x - 1, 0), (size_x - 1, size_z - 1)):
+        blueprint.fill((x, 0, z), (x, wall_height - 1, z), Block("spruce_log"))
+
+    #Doors in the middle of the first long wall, double doors for even lengths
+    blueprint.begin_stage("doors")
+    facing = "south" if orientation else "east"
+    if even_dimension:
+        hinges = ("right", "left") if orientation else ("left", "right")
+        blueprint.place(_along(design, midpoint - 1, 0, 0), Block("dark_oak_door", {"facing": facing, "hinge": hinges[0]}))
+        blueprint.place(_along(design, midpoint, 0, 0), Block("dark_oak_door", {"facing": facing, "hinge": hinges[1]}))
+    else:
+        blueprint.place(_along(design, midpoint, 0, 0), Block("dark_oak_door", {"facing": facing, "hinge": "right"}))
+
+    #Roof, sloping up to the ridge along the length with one block of overhang all round
+    blueprint.begin_stage("roof")
+    ridge = (midpoint - 1, midpoint) if even_dimension else (midpoint,)
+    for along in range(-1, length + 1):
+        slope_height = calculate_slope_height(along, 0, max_slope_height, midpoint, even_dimension, slope_height_increase_per_block)
+        if along in ridge:
+            roof_block = Block(design.plateau)
+        else:
+            stair_direction = get_stair_facing(along, along, midpoint, orientation)
+            roof_block = Block(design.roof_type, {"facing": stair_direction})
+        for across in range(-1, design.width + 1):
+            blueprint.place(_along(design, along, wall_height + slope_height, across), roof_block)
+
+    #Glass windows fill the gable walls under the roof, one block narrower on each side per row up
+    blueprint.begin_stage("windows")
+    far_wall = design.width - 1
+    for row in range(max_slope_height):
+        for along in range(1 + row, length - 1 - row):
+            blueprint.place(_along(design, along, wall_height + row, 0), Block("glass"))
+            blueprint.place(_along(design, along, wall_height + row, far_wall), Block("glass"))
+
+    # LANTERN always at top of roof and a two random opposite corners
+    blueprint.begin_stage("interior")
+    lantern = Block("lantern", {"hanging": "true"})
+    blueprint.place((1, wall_height, 1), lantern)
+    blueprint.place((size_x - 2, wall_height, size_z - 2), lantern)
+    #Hanging one block under the ridge
+    ridge_height = calculate_slope_height(midpoint, 0, max_slope_height, midpoint, even_dimension, slope_height_increase_per_block)
+    ridge_lantern_height = wall_height + ridge_height - 1
+    blueprint.place(_along(design, midpoint, ridge_lantern_height, design.lantern), lantern)
+
+    #Bed against one end wall, the rest of the interior along the other end for consistency
+    ends = (1, length - 2)
+    bed_end, item_end = ends if design.bed_at_start else ends[::-1]
+    if orientation:
+        blueprint.place((bed_end, 0, size_z - 3), Block(design.bed_colour, {"facing": "south"}))
+    else:
+        blueprint.place((size_x - 3, 0, bed_end), Block(design.bed_colour, {"facing": "east"}))
+    for item, across in zip(("crafting_table", "furnace", "chest"), design.furniture):
+        blueprint.place(_along(design, item_end, 0, across), Block(item))
+
+    return blueprint
+
+
+#Function which returns the (x, z) size of the cabin's walls
+def cabin_footprint(design):
+    return (design.length, design.width) if design.orientation else (design.width, design.length)
+
+
+#Function which returns where the blueprint's local origin lands for a pad at pad_origin
+#pad_origin is the global (x, y, z) of the pad corner one block above the floor
+def cabin_origin(design, pad_origin):
+    return (pad_origin[0] + design.offset[0], pad_origin[1], pad_origin[2] + design.offset[1])
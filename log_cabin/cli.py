@@ -0,0 +1,340 @@
+import argparse
+import os
+import random
+
+#Command line for the generator. Only argparse is imported up front: gdpc, numpy and the generator
+#load once the arguments are parsed, so --help and importing this module stay fast. The work itself
+#is done by the library calls in log_cabin.generator.
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate a log cabin in the GDMC build area")
+    parser.add_argument("--offline", action="store_true", help="build into an in-memory world instead of a GDMC HTTP server")
+    parser.add_argument("--offline-size", type=int, nargs=2, default=[128, 128], metavar=("X", "Z"), help="size of the generated offline world")
+    parser.add_argument("--world", help="load the offline world from a .npz file saved with --save-world")
+    parser.add_argument("--save-world", help="save the offline world to this .npz file after building")
+    parser.add_argument("--seed", type=int, help="seed for terrain and design choices, makes runs reproducible")
+    parser.add_argument("--variant-cache", help="directory where compiled cabin variants are kept between runs")
+    parser.add_argument("--houses", type=int, default=1, help="build a settlement of up to this many cabins")
+    parser.add_argument("--workers", type=int, help="generate settlement designs on this many processes (0 for one per core)")
+    parser.add_argument("--cabin-size", type=int, nargs=2, action="append", metavar=("LENGTH", "WIDTH"),
+                        help="build cabins of this footprint, give it more than once to build the largest that fits the site")
+    parser.add_argument("--wall-height", type=int, help="build cabins with walls this high instead of 5 or 7 at random")
+    parser.add_argument("--foundation", choices=["flatten", "raised", "auto"], default="flatten",
+                        help="level the pad, raise the floor on stilts or a plinth over the natural terrain, or take whichever writes fewer blocks")
+    parser.add_argument("--variance-threshold", type=float, help="highest height variance a site may have (10 by default)")
+    parser.add_argument("--compact", action="store_true", help="analyse the terrain as int16 heights and int32 scores, for very large build areas")
+    parser.add_argument("--tile-size", type=int, help="search a single cabin's site in tiles of this many blocks instead of loading the whole build area")
+    parser.add_argument("--site-score", choices=["variance", "edits"], default="variance",
+                        help="pick sites by height variance or by the exact blocks flattening would write (not used with --tile-size)")
+    parser.add_argument("--dry-run", action="store_true", help="print the site and flattening plan, then stop before writing anything")
+    parser.add_argument("--export-rasters", help="write variance, slope, water and flatten cost rasters to this directory")
+    parser.add_argument("--raster-format", choices=["png", "npy"], default="png", help="image or numpy array files for --export-rasters")
+    parser.add_argument("--raster-stride", type=int, default=1, help="keep every Nth window position in exported rasters")
+    parser.add_argument("--no-plot", action="store_true", help="no longer needed, nothing is plotted unless --export-rasters is given")
+    parser.add_argument("--batch-size", type=int, default=4096, help="blocks per placeBlocks request")
+    parser.add_argument("--in-flight", type=int, default=2, help="placeBlocks requests sent in the background at once (0 to send in line)")
+    parser.add_argument("--write-retries", type=int, default=4, help="times a failed placeBlocks request is retried, with doubling backoff")
+    parser.add_argument("--no-terrain-updates", action="store_true", help="skip neighbour block updates while flattening")
+    parser.add_argument("--structure-out", help="save the flattened site and cabin as a Minecraft structure .nbt file")
+    parser.add_argument("--bulk", action="store_true", help="place the flattened site and cabin with one structure request instead of block writes")
+    parser.add_argument("--place-structure", help="place a structure .nbt file at --structure-origin, then stop")
+    parser.add_argument("--structure-origin", type=int, nargs=3, metavar=("X", "Y", "Z"), help="lowest corner for --place-structure")
+    parser.add_argument("--snapshot", help="save the original state of every block the run writes to this .npz file")
+    parser.add_argument("--rollback", help="write back the blocks saved by an earlier --snapshot, then stop")
+    parser.add_argument("--slice-cache", help="keep loaded heightmaps, water and rasters in this directory for later runs on the same area")
+    parser.add_argument("--slice-cache-size", type=int, default=1024, help="megabytes the slice cache may use before old areas are evicted")
+    parser.add_argument("--metrics", help="write per-phase timings and traffic to this file")
+    parser.add_argument("--metrics-format", choices=["json", "openmetrics"], default="json", help="format of the --metrics file")
+    parser.add_argument("--profile", help="write a cProfile dump for every phase to this directory")
+    return parser
+
+
+#Function which returns the key the slice cache files a run's world under
+def world_id(args, editor):
+    if not args.offline:
+        return f"{editor.host}:{editor.dimension}"
+    if args.world:
+        return f"file:{os.path.abspath(args.world)}:{os.path.getmtime(args.world)}"
+    return f"generated:{args.seed or 0}:{tuple(args.offline_size)}"
+
+
+#Function which prints what laying a site's foundation would write
+def print_site_plan(site, plan):
+    foundation, fill = ("", "dirt") if plan["foundation"] == "flatten" else (f"{plan['foundation']}, ", "support")
+    print(f"Plan for {site}: {foundation}floor at {plan['base_height']}, {plan['air_blocks']} air, {plan['fill_blocks']} {fill} "
+          f"and {plan['floor_blocks']} floor blocks ({plan['blocks']} in total, {plan['spans']} spans)")
+
+
+#Function which runs the generator from the command line, returns the exit status
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.snapshot:
+        return _run(parser, args)
+
+    from log_cabin.snapshot import Snapshot
+
+    snapshot = Snapshot()
+    try:
+        return _run(parser, args, snapshot)
+    finally:
+        #Saved even when the build stops part way, so whatever was written can still be rolled back
+        if len(snapshot):
+            snapshot.save(args.snapshot)
+            print(f"Saved the original state of {len(snapshot)} blocks to {args.snapshot}, undo the build with --rollback {args.snapshot}")
+
+
+def _run(parser, args, snapshot=None):
+    footprints = [tuple(size) for size in args.cabin_size or []]
+    if len(footprints) > 1 and (args.tile_size is not None or args.site_score != "variance" or args.compact):
+        parser.error("several --cabin-size footprints are only searched by variance, without --tile-size or --compact")
+
+    from gdpc import __url__
+    from gdpc.exceptions import InterfaceConnectionError, BuildAreaNotSetError
+
+    from log_cabin.cabin import check_cabin_size, footprint_pad
+    from log_cabin.foundation import plan_cabin_site, site_plan_summary
+    from log_cabin.generator import (
+        PAD_SIZE, VARIANCE_THRESHOLD, build_cabin_site, find_largest_site, find_raised_site, find_site, load_site, load_terrain,
+        open_editor,
+    )
+    from log_cabin.metrics import RunMetrics
+    from log_cabin.parallel import build_settlement_parallel
+    from log_cabin.settlement import build_settlement, plan_largest_settlement, plan_settlement, plot_size, task_rng
+    from log_cabin.slice_cache import SliceCache
+    from log_cabin.snapshot import Snapshot
+    from log_cabin.structure import load_structure, place_structure, save_structure
+    from log_cabin.terrain import compact_window_fits
+    from log_cabin.variants import VariantCache
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    variance_threshold = VARIANCE_THRESHOLD if args.variance_threshold is None else args.variance_threshold
+    try:
+        check_cabin_size(wall_height=args.wall_height)
+        for footprint in footprints:
+            check_cabin_size(footprint)
+    except ValueError as error:
+        parser.error(str(error))
+    #Pad the cabin is built on, for several footprints the one the site search picks
+    footprint = footprints[0] if footprints else None
+    area_size = footprint_pad(footprint) if footprint is not None else PAD_SIZE
+    if args.compact and not compact_window_fits(area_size):
+        parser.error(f"--compact cannot score {area_size[0]}x{area_size[1]} pads exactly in int32, use a smaller --cabin-size")
+    terrain_updates = not args.no_terrain_updates
+
+    #Writes go through a pipeline that drops overwritten blocks, sorts by chunk and sends in the background
+    editor = open_editor(args.offline, args.world, args.offline_size, args.seed or 0, args.batch_size, args.in_flight, args.write_retries,
+                         snapshot)
+    #Only when metrics or profiles are asked for are writes flushed at the end of each phase, so every phase
+    #is charged for its own blocks. Otherwise background sends overlap the next phase, and are charged to it.
+    metrics = RunMetrics(editor, profile_dir=args.profile, flush_each_phase=bool(args.metrics or args.profile))
+    slice_cache = None
+    if args.slice_cache:
+        slice_cache = SliceCache(args.slice_cache, world_id(args, editor), max_bytes=args.slice_cache_size << 20)
+
+    #Function which sends the remaining writes, the chunks they touched are marked stale in the slice cache on the way out
+    def close_editor():
+        with metrics.phase("flush"):
+            editor.close()
+
+    #Function which prints the phase table, writes the metrics file if one was asked for and saves the offline world
+    def finish(show_traffic=True):
+        print(metrics.report())
+        if args.metrics:
+            metrics.write(args.metrics, args.metrics_format)
+        if args.offline:
+            if show_traffic:
+                print(f"Offline world traffic: {editor.stats}")
+            if args.save_world:
+                editor.world.save(args.save_world)
+
+    try:
+        # Check if the editor can connect to the GDMC HTTP interface.
+        try:
+            editor.checkConnection()
+        except InterfaceConnectionError:
+            print(
+                f"Error: Could not connect to the GDMC HTTP interface at {editor.host}!\n"
+                "To use GDPC, you need to use a \"backend\" that provides the GDMC HTTP interface.\n"
+                "For example, by running Minecraft with the GDMC HTTP mod installed.\n"
+                f"See {__url__}/README.md for more information."
+            )
+            return 1
+
+        #An earlier run's snapshot is written back, undoing that build
+        if args.rollback:
+            with metrics.phase("rollback"):
+                restored = Snapshot.load(args.rollback).restore(editor)
+            print(f"Restored {restored} blocks from {args.rollback}")
+            close_editor()
+            finish(show_traffic=False)
+            return 0
+
+        #A structure baked by an earlier run is placed as it is, no search or flattening
+        if args.place_structure:
+            if args.structure_origin is None:
+                print("Error: --place-structure needs --structure-origin X Y Z")
+                return 1
+            with metrics.phase("structure"):
+                placed = place_structure(editor, load_structure(args.place_structure), args.structure_origin)
+            print(f"Placed {placed} blocks from {args.place_structure} at {tuple(args.structure_origin)}")
+            close_editor()
+            finish(show_traffic=False)
+            return 0
+
+        # Get the build area.
+        try:
+            buildArea = editor.getBuildArea()
+        except BuildAreaNotSetError:
+            print(
+                "Error: failed to get the build area!\n"
+                "Make sure to set the build area with the /setbuildarea command in-game.\n"
+                "For example: /setbuildarea ~0 0 ~0 ~64 200 ~64"
+            )
+            return 1
+
+        buildRect = buildArea.toRect()
+        #Tiled mode streams the build area through the site search and never holds all of it at once
+        tiled = args.tile_size is not None and args.houses == 1
+        terrain = None if tiled else load_terrain(editor, buildRect, slice_cache, metrics, compact=args.compact, area_size=area_size)
+
+        # Writing the terrain rasters, headless so unattended runs never wait on a plot window
+        if args.export_rasters:
+            if tiled:
+                print("Terrain rasters need the whole build area loaded, skipping the export in tiled mode")
+            else:
+                with metrics.phase("raster_export"):
+                    paths = terrain.rasters.export(args.export_rasters, stride=args.raster_stride, format=args.raster_format)
+                print(f"Wrote {len(paths)} terrain rasters to {args.export_rasters}")
+
+        #Settlement mode ranks every window once and builds on as many separate plots as it can find
+        if args.houses > 1:
+            print(f"Planning a settlement of up to {args.houses} cabins...")
+            plot_footprints = None
+            with metrics.phase("site_search"):
+                if len(footprints) > 1:
+                    #Each plot gets the largest footprint whose pad still fits between the plots already chosen
+                    plots = plan_largest_settlement(buildRect, terrain.heightmap, terrain.water_mask, args.houses, footprints,
+                                                    variance_threshold=variance_threshold, foundation=args.foundation)
+                    plot_footprints = [plot_footprint for _, _, plot_footprint in plots]
+                    plots = [(optimal_spot, variance) for optimal_spot, variance, _ in plots]
+                else:
+                    plots = plan_settlement(buildRect, terrain.heightmap, terrain.water_mask, args.houses, area_size, variance_threshold=variance_threshold,
+                                            rasters=terrain.rasters, rank_by=args.site_score, foundation=args.foundation)
+            if not plots:
+                print("No suitable building area found. Please try a new build area")
+                return 1
+            #Every plot draws from its own generator, so the seed gives the same settlement with or without --workers
+            settlement_seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+            if args.dry_run:
+                #Designs are drawn the way the settlement builders draw them
+                for index, (optimal_spot, _) in enumerate(plots):
+                    plot_footprint, plot_area = plot_size(index, plot_footprints, footprint, area_size)
+                    _, _, plan = plan_cabin_site(buildRect, terrain.heightmap, terrain.heightmap_leaves, optimal_spot,
+                                                 task_rng(settlement_seed, index), plot_area,
+                                                 plot_footprint, args.wall_height, args.foundation)
+                    print_site_plan(optimal_spot, site_plan_summary(plan))
+                finish(show_traffic=False)
+                return 0
+            if terrain.world_slice is None:
+                #The build area came from the slice cache, only the plots are loaded to seed the local world model
+                with metrics.phase("slice_load"):
+                    for index, (optimal_spot, _) in enumerate(plots):
+                        load_site(editor, optimal_spot, plot_size(index, plot_footprints, footprint, area_size)[1])
+            if plot_footprints is not None:
+                print("Cabin sizes: " + ", ".join(f"{length}x{width}" for length, width in plot_footprints))
+            print(f"Found {len(plots)} plots, building...")
+            with metrics.phase("settlement"):
+                if args.workers is None:
+                    built = build_settlement(editor, buildRect, terrain.heightmap, terrain.heightmap_leaves, plots, area_size,
+                                             seed=settlement_seed, variant_cache=VariantCache(args.variant_cache), terrain_updates=terrain_updates,
+                                             footprint=footprint, wall_height=args.wall_height, foundation=args.foundation,
+                                             footprints=plot_footprints)
+                else:
+                    built, report = build_settlement_parallel(editor, buildRect, terrain.heightmap, terrain.heightmap_leaves, plots,
+                                                              seed=settlement_seed, area_size=area_size, workers=args.workers,
+                                                              cache_directory=args.variant_cache, terrain_updates=terrain_updates,
+                                                              footprint=footprint, wall_height=args.wall_height, foundation=args.foundation,
+                                                              footprints=plot_footprints)
+                    print(f"Generated on {report['workers']} processes in {report['seconds']:.2f}s, waited {report['generation_wait_seconds']:.2f}s "
+                          f"for designs and spent {report['write_seconds']:.2f}s writing, bottleneck: {report['bottleneck']}")
+            print(f"Your settlement of {len(built)} log cabins has successfully been built")
+            close_editor()
+            finish()
+            return 0
+
+        #Call function to get optimal co-ords
+        print(f"Searching for optimal build area...")
+        predicted_edits = None
+        if len(footprints) > 1:
+            #Every footprint's pad is scored from the same terrain sums, the largest cabin that fits anywhere wins
+            optimal_spot, footprint, variance = find_largest_site(buildRect, terrain, footprints, variance_threshold, metrics)
+            if footprint is not None:
+                area_size = footprint_pad(footprint)
+                print(f"Largest cabin that fits: {footprint[0]}x{footprint[1]} on a {area_size[0]}x{area_size[1]} pad")
+        else:
+            optimal_spot, variance, predicted_edits = find_site(editor, buildRect, terrain, variance_threshold, args.site_score, args.tile_size,
+                                                                metrics, area_size)
+        if predicted_edits is not None:
+            print(f"Fewest flattening edits: {predicted_edits} blocks")
+        raised_fallback = ((not optimal_spot or variance >= variance_threshold) and args.foundation != "flatten"
+                           and terrain is not None and len(footprints) <= 1)
+        if raised_fallback:
+            #Too rough to flatten anywhere, a raised floor goes on the dry site with the shortest supports
+            optimal_spot, height_range = find_raised_site(buildRect, terrain, metrics)
+        #If variance is too high or no area without water is found, program ends and advises user to find another build area to test
+        if not optimal_spot:
+            print(f"No suitable building area found: every dry area is too rough (variance {variance_threshold} or more) or there is too much water. Please try a new build area")
+            return 1
+        if raised_fallback:
+            print(f"No site is under the variance threshold, raising the cabin at {optimal_spot} where the ground drops {height_range} blocks")
+        elif variance >= variance_threshold:
+            print(f"No optimal build area found. Area with lowest variance: {variance}, exceeds acceptable threshold. Please try a new build area")
+            return 1
+        else:
+            print(f"Optimal building spot found at: {optimal_spot} with variance: {variance}")
+
+        if tiled:
+            #Only the chosen site is loaded for flattening
+            buildRect, heightmap, heightmap_leaves = load_site(editor, optimal_spot, area_size, metrics)
+        else:
+            heightmap, heightmap_leaves = terrain.heightmap, terrain.heightmap_leaves
+            if terrain.world_slice is None and not args.dry_run:
+                #The build area came from the slice cache, only the site is loaded to seed the local world model
+                load_site(editor, optimal_spot, area_size, metrics)
+        if args.dry_run:
+            _, _, plan = plan_cabin_site(buildRect, heightmap, heightmap_leaves, optimal_spot, random, area_size, footprint, args.wall_height,
+                                         args.foundation)
+            print_site_plan(optimal_spot, site_plan_summary(plan))
+            finish(show_traffic=False)
+            return 0
+
+        print("Building cabin...")
+        result = build_cabin_site(editor, buildRect, heightmap, heightmap_leaves, optimal_spot, rng=random,
+                                  variant_cache=VariantCache(args.variant_cache), bulk=args.bulk, bake=args.structure_out is not None,
+                                  terrain_updates=terrain_updates, area_size=area_size, metrics=metrics, footprint=footprint,
+                                  wall_height=args.wall_height, foundation=args.foundation)
+        base_height = result["base_height"]
+        if result["flatten_edits"] is not None:
+            laid = "Flattening" if result["foundation"] == "flatten" else f"Raising the floor on {result['foundation']}"
+            print(f"{laid} edited {result['flatten_edits']['blocks']} blocks (previous method: {result['flatten_edits']['legacy_blocks']})")
+        print(f"Base height for building after flattening: {base_height}")
+        if args.bulk:
+            print(f"Site placed with one structure request: {result['blocks_written']} blocks")
+        else:
+            print(f"Cabin complete: {result['blocks_written']} blocks from a palette of {len(result['blueprint'].palette) - 1}")
+        if args.structure_out:
+            site = result["site"]
+            save_structure(site, args.structure_out)
+            print(f"Site saved to {args.structure_out}, place it again with --place-structure {args.structure_out} "
+                  f"--structure-origin {site.offset[0]} {site.offset[1]} {site.offset[2]}")
+        print(f"Your log cabin has successfully been built at X:{optimal_spot[0]} and Z:{optimal_spot[1]} with an average height of {base_height}")
+        close_editor()
+        finish()
+        return 0
+    finally:
+        #Chunks written before a failure are marked stale too, so a warm run never reuses their old terrain
+        if slice_cache is not None:
+            slice_cache.invalidate(editor.local_world.modified_chunks())
@@ -0,0 +1,112 @@
+import numpy as np
+from gdpc import Block, Rect
+
+from log_cabin.mock import HEIGHTMAP_TYPES, MockWorld, synthetic_heightmap
+from log_cabin.palette import block_from_key, block_key
+
+#Recorded terrain for benchmarks: the four heightmaps plus the ground block of every column.
+#A TerrainFixture answers the WorldSlice calls terrain analysis makes (rect, heightmaps and
+#ground-block lookups), and can rebuild a MockWorld around any part of it for flatten and build runs.
+
+
+class TerrainFixture:
+    def __init__(self, rect, heightmaps, surface, palette, y_begin=0, y_size=192):
+        self.rect = Rect(rect.offset, rect.size)
+        self.heightmaps = heightmaps
+        self.surface = surface
+        self.palette = palette
+        self.y_begin = y_begin
+        self.y_size = y_size
+
+    def __repr__(self):
+        return f"TerrainFixture{repr(self.rect)}"
+
+    #Function which answers ground-block lookups, everything under the ground reads as stone
+    def getBlockGlobal(self, position):
+        local_x = int(position[0]) - self.rect.begin.x
+        local_z = int(position[2]) - self.rect.begin.y
+        ground = self.heightmaps["MOTION_BLOCKING_NO_LEAVES"][local_x, local_z] - 1
+        if position[1] == ground:
+            return block_from_key(self.palette[self.surface[local_x, local_z]])
+        return Block("minecraft:stone" if position[1] < ground else "minecraft:air")
+
+    def save(self, path):
+        np.savez_compressed(path, origin=np.array(tuple(self.rect.offset)), surface=self.surface,
+                            palette=np.array(self.palette), y_begin=np.array(self.y_begin),
+                            y_size=np.array(self.y_size), **self.heightmaps)
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as data:
+            heightmaps = {name: data[name] for name in HEIGHTMAP_TYPES if name in data}
+            size = heightmaps["MOTION_BLOCKING_NO_LEAVES"].shape
+            return TerrainFixture(Rect(tuple(int(value) for value in data["origin"]), size), heightmaps,
+                                  data["surface"], [str(key) for key in data["palette"]],
+                                  int(data["y_begin"]), int(data["y_size"]))
+
+    #Function which returns the part of the fixture inside rect, the way loadWorldSlice returns part of a world
+    def crop(self, rect):
+        local = (slice(rect.begin.x - self.rect.begin.x, rect.end.x - self.rect.begin.x),
+                 slice(rect.begin.y - self.rect.begin.y, rect.end.y - self.rect.begin.y))
+        heightmaps = {name: heightmap[local].copy() for name, heightmap in self.heightmaps.items()}
+        return TerrainFixture(rect, heightmaps, self.surface[local].copy(), self.palette, self.y_begin, self.y_size)
+
+    #Function which builds a voxel world for part of the fixture: stone, the recorded ground block,
+    #water down to OCEAN_FLOOR where the ground block is a liquid, and a leaf block at each canopy top
+    def to_world(self, rect=None):
+        rect = self.rect if rect is None else rect
+        local = (slice(rect.begin.x - self.rect.begin.x, rect.end.x - self.rect.begin.x),
+                 slice(rect.begin.y - self.rect.begin.y, rect.end.y - self.rect.begin.y))
+        world = MockWorld(rect.offset, tuple(rect.size), self.y_begin, self.y_size)
+        ground = self.heightmaps["MOTION_BLOCKING_NO_LEAVES"][local] - 1 - self.y_begin
+        floor = self.heightmaps.get("OCEAN_FLOOR", self.heightmaps["MOTION_BLOCKING_NO_LEAVES"])[local] - self.y_begin
+        canopy = self.heightmaps.get("MOTION_BLOCKING", self.heightmaps["MOTION_BLOCKING_NO_LEAVES"])[local] - 1 - self.y_begin
+        surface_ids = np.array([world.palette_id(block_from_key(key)) for key in self.palette])[self.surface[local]]
+
+        ys = np.arange(self.y_size)[None, :, None]
+        stone = world.palette_id(Block("stone"))
+        world.grid[ys < np.minimum(floor, ground)[:, None, :]] = stone
+        liquid = np.broadcast_to((ys >= floor[:, None, :]) & (ys < ground[:, None, :]), world.grid.shape)
+        world.grid[liquid] = np.broadcast_to(surface_ids[:, None, :], world.grid.shape)[liquid]
+        top = np.broadcast_to(ys == ground[:, None, :], world.grid.shape)
+        world.grid[top] = np.broadcast_to(surface_ids[:, None, :], world.grid.shape)[top]
+        leaves = np.broadcast_to((ys == canopy[:, None, :]) & (canopy > ground)[:, None, :], world.grid.shape)
+        world.grid[leaves] = world.palette_id(Block("oak_leaves"))
+        return world
+
+
+#Function which records a loaded world slice as a fixture, one ground-block lookup per column
+def record_fixture(worldSlice):
+    heightmaps = {name: np.array(worldSlice.heightmaps[name]) for name in HEIGHTMAP_TYPES if name in worldSlice.heightmaps}
+    ground = heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+    palette = []
+    palette_index = {}
+    surface = np.zeros(ground.shape, dtype=np.uint16)
+    begin = worldSlice.rect.begin
+    for local_x in range(ground.shape[0]):
+        for local_z in range(ground.shape[1]):
+            key = block_key(worldSlice.getBlockGlobal((begin.x + local_x, int(ground[local_x, local_z]) - 1, begin.y + local_z)))
+            if key not in palette_index:
+                palette_index[key] = len(palette)
+                palette.append(key)
+            surface[local_x, local_z] = palette_index[key]
+    return TerrainFixture(worldSlice.rect, heightmaps, surface, palette, worldSlice.yBegin, worldSlice.ySize)
+
+
+#Function which makes a fixture without a voxel world, so very large areas stay cheap:
+#noise terrain, water up to sea level, grass on land and scattered tree canopies
+def synthetic_fixture(size, seed=0, sea_level=62, tree_density=0.004):
+    rng = np.random.default_rng(seed)
+    ground = synthetic_heightmap(size, seed=seed, base_height=sea_level + 8)
+    wet = ground - 1 < sea_level
+    surface_height = np.where(wet, sea_level + 1, ground)
+    canopy = np.where(~wet & (rng.random(ground.shape) < tree_density), ground + 7, surface_height)
+    heightmaps = {
+        "MOTION_BLOCKING": canopy,
+        "MOTION_BLOCKING_NO_LEAVES": surface_height,
+        "OCEAN_FLOOR": np.where(canopy > surface_height, canopy, ground),
+        "WORLD_SURFACE": canopy,
+    }
+    palette = ["minecraft:grass_block", "minecraft:water"]
+    surface = wet.astype(np.uint16)
+    return TerrainFixture(Rect((0, 0), ground.shape), heightmaps, surface, palette)
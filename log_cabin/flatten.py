@@ -0,0 +1,194 @@
+import random
+
+import numpy as np
+from gdpc import Block, Box
+from gdpc.geometry import placeBox
+
+from log_cabin.terrain import summed_area_table, window_sums
+
+#Terrain flattening for the build pad.
+#Edits are emitted as vertical spans bounded by each column's real top, instead of one block at a
+#time up to the build limit, so air is never written over air above the surface.
+
+WOOD_TYPES = ["spruce_planks", "oak_planks", "birch_planks", "dark_oak_planks"]
+
+#Upper bound the original flattening cleared to, kept so edit counts can be compared
+LEGACY_CLEAR_LIMIT = 256
+
+
+#Function which returns the top flattening clears down to the floor from, one above each column's highest
+#block: MOTION_BLOCKING for canopies, WORLD_SURFACE for grass, flowers, snow layers and torches on top
+def surface_top(heightmaps):
+    if "WORLD_SURFACE" not in heightmaps:
+        return heightmaps["MOTION_BLOCKING"]
+    return np.maximum(heightmaps["MOTION_BLOCKING"], heightmaps["WORLD_SURFACE"])
+
+
+#Function which returns the average ground height of the area, used as the floor level
+def average_ground_height(heightmap, local_start, area_size):
+    window = heightmap[local_start[0]:local_start[0] + area_size[0], local_start[1]:local_start[1] + area_size[1]]
+    return int(np.mean(window - 1))
+
+
+#Function which works out the vertical spans flattening has to edit
+#Returns the floor height and a list of (x, z, z_size, y_begin, y_end, block_id) spans in global
+#co-ordinates, y_end exclusive. Neighbouring columns along z with the same span are merged.
+#heightmap_leaves is the top the column is cleared from, see surface_top.
+def plan_flatten_spans(buildRect, heightmap, heightmap_leaves, optimal_coords, area_size=(15, 15)):
+    local_start = (optimal_coords[0] - buildRect.begin.x, optimal_coords[1] - buildRect.begin.y)
+    average_height = average_ground_height(heightmap, local_start, area_size)
+
+    def column_edits(local_x, local_z):
+        column = []
+        # Clear from just above the floor up to the column's top block, leaves and plants included
+        top = int(heightmap_leaves[local_x, local_z])
+        if top > average_height + 1:
+            column.append((average_height + 1, top, "minecraft:air"))
+        # Fill from the first air block up to just under the floor, which is placed separately
+        ground = int(heightmap[local_x, local_z])
+        if ground < average_height:
+            column.append((ground, average_height, "minecraft:dirt"))
+        return column
+
+    return average_height, column_spans(buildRect, local_start, area_size, column_edits)
+
+
+#Function which turns per-column edits into spans. column_edits(local_x, local_z) returns the column's
+#(y_begin, y_end, block_id) edits, neighbouring columns along z with the same edits become one span.
+def column_spans(buildRect, local_start, area_size, column_edits):
+    spans = []
+    for local_x in range(local_start[0], local_start[0] + area_size[0]):
+        run = None
+        for local_z in range(local_start[1], local_start[1] + area_size[1]):
+            column = tuple(column_edits(local_x, local_z))
+            if run is not None and run[1] == column:
+                run[2] += 1
+                continue
+            if run is not None:
+                spans.extend(_run_spans(buildRect, local_x, run))
+            run = [local_z, column, 1]
+        if run is not None:
+            spans.extend(_run_spans(buildRect, local_x, run))
+    return spans
+
+
+def _run_spans(buildRect, local_x, run):
+    local_z, column, z_size = run
+    return [
+        (buildRect.begin.x + local_x, buildRect.begin.y + local_z, z_size, y_begin, y_end, block_id)
+        for y_begin, y_end, block_id in column
+    ]
+
+
+#Function which summarises what flattening a site would write, without writing anything
+def flatten_plan(buildRect, heightmap, heightmap_leaves, optimal_coords, area_size=(15, 15)):
+    average_height, spans = plan_flatten_spans(buildRect, heightmap, heightmap_leaves, optimal_coords, area_size)
+    air = sum((y_end - y_begin) * z_size for _, _, z_size, y_begin, y_end, block_id in spans if block_id == "minecraft:air")
+    dirt = sum((y_end - y_begin) * z_size for _, _, z_size, y_begin, y_end, block_id in spans if block_id == "minecraft:dirt")
+    floor = area_size[0] * area_size[1]
+    return {
+        "site": tuple(optimal_coords),
+        "base_height": average_height,
+        "spans": len(spans),
+        "air_blocks": air,
+        "dirt_blocks": dirt,
+        "floor_blocks": floor,
+        "blocks": air + dirt + floor,
+    }
+
+
+#Function which counts, for every area_size window, the blocks flattening it would write, exactly as
+#plan_flatten_spans would. heightmap_leaves must be the same top plan_flatten_spans is given (surface_top).
+#Returns (levels, air, dirt) rasters indexed by window start: the floor height, the air cleared down to it
+#(canopies and plants included) and the dirt filled up to it.
+#Per window with floor L, air is sum(max(0, top - L - 1)) and dirt is sum(max(0, L - ground)).
+#Both are rewritten as sums over height levels of windowed "column below level" counts, so each
+#level is one summed-area pass. Tiles keep the levels walked close to the local terrain.
+def window_flatten_edits(heightmap, heightmap_leaves, area_size=(15, 15), tile_size=256):
+    count = area_size[0] * area_size[1]
+    starts = (heightmap.shape[0] - area_size[0] + 1, heightmap.shape[1] - area_size[1] + 1)
+    if starts[0] <= 0 or starts[1] <= 0:
+        empty = np.empty((0, 0), dtype=np.int32)
+        return empty, empty, empty
+    levels = np.empty(starts, dtype=np.int32)
+    air = np.empty(starts, dtype=np.int32)
+    dirt = np.empty(starts, dtype=np.int32)
+
+    for tile_x in range(0, starts[0], tile_size):
+        for tile_z in range(0, starts[1], tile_size):
+            cells = (slice(tile_x, min(tile_x + tile_size, starts[0]) + area_size[0] - 1),
+                     slice(tile_z, min(tile_z + tile_size, starts[1]) + area_size[1] - 1))
+            ground = heightmap[cells].astype(np.int64)
+            top = heightmap_leaves[cells].astype(np.int64)
+            #Same floor as average_ground_height: the mean ground block, truncated
+            level = np.trunc(window_sums(summed_area_table(ground - 1), area_size) / count).astype(np.int64)
+            clear_from = level + 1
+
+            #sum(max(0, c - h)) is the number of (column, k) pairs with h < k <= c
+            top_below = np.zeros(level.shape, dtype=np.int64)
+            ground_below = np.zeros(level.shape, dtype=np.int64)
+            highest = int(level.max())
+            for k in range(int(ground.min()) + 1, highest + 2):
+                top_below += np.where(k <= clear_from, window_sums(summed_area_table(top < k, np.int32), area_size), 0)
+                if k <= highest:
+                    ground_below += np.where(k <= level, window_sums(summed_area_table(ground < k, np.int32), area_size), 0)
+
+            window = (slice(tile_x, tile_x + level.shape[0]), slice(tile_z, tile_z + level.shape[1]))
+            levels[window] = level
+            #sum(max(0, top - c)) = sum(top) - count * c + sum(max(0, c - top))
+            air[window] = window_sums(summed_area_table(top), area_size) - count * clear_from + top_below
+            dirt[window] = ground_below
+    return levels, air, dirt
+
+
+#Function which picks the dry window that flattening would edit the fewest blocks for
+#rasters is the run's TerrainRasters, windows at or over variance_threshold are left out
+#Returns ((x, z), blocks) with ties going to the lowest x then z, or (None, inf)
+def find_minimum_edit_spot(buildRect, rasters, variance_threshold=None):
+    costs = rasters.get("edit_scores")
+    if costs.size == 0:
+        return None, float('inf')
+    if variance_threshold is not None:
+        costs = np.where(rasters.get("scores") < variance_threshold * rasters.score_scale, costs, np.inf)
+    best = np.unravel_index(np.argmin(costs), costs.shape)
+    if not np.isfinite(costs[best]):
+        return None, float('inf')
+    return (buildRect.begin.x + int(best[0]), buildRect.begin.y + int(best[1])), int(costs[best])
+
+
+#Function which counts the placeBlock calls the original one-block-at-a-time flattening made
+def legacy_flatten_edit_count(heightmap, heightmap_leaves, local_start, area_size, average_height):
+    window = (slice(local_start[0], local_start[0] + area_size[0]), slice(local_start[1], local_start[1] + area_size[1]))
+    current = heightmap[window] - 1
+    current_leaves = heightmap_leaves[window] - 1
+    cleared = current_leaves > average_height
+    filled = ~cleared & (current < average_height)
+    return int(
+        cleared.sum() * max(0, LEGACY_CLEAR_LIMIT - (average_height + 1))
+        + (average_height - current[filled]).sum()
+        + area_size[0] * area_size[1]
+    )
+
+
+def flatten_build_area(editor, buildRect, heightmap, optimal_coords, area_size=(15, 15), heightmap_leaves=None, wood_choice=None):
+    if heightmap_leaves is None:
+        heightmap_leaves = heightmap
+    average_height, spans = plan_flatten_spans(buildRect, heightmap, heightmap_leaves, optimal_coords, area_size)
+
+    edits = 0
+    for x, z, z_size, y_begin, y_end, block_id in spans:
+        placeBox(editor, Box((x, y_begin, z), (1, y_end - y_begin, z_size)), Block(block_id))
+        edits += (y_end - y_begin) * z_size
+
+    #Create a floor for build area of random wood type
+    if wood_choice is None:
+        wood_choice = random.choice(WOOD_TYPES)
+    placeBox(editor, Box((optimal_coords[0], average_height, optimal_coords[1]), (area_size[0], 1, area_size[1])), Block(wood_choice))
+    edits += area_size[0] * area_size[1]
+
+    local_start = (optimal_coords[0] - buildRect.begin.x, optimal_coords[1] - buildRect.begin.y)
+    edit_counts = {
+        "blocks": edits,
+        "legacy_blocks": legacy_flatten_edit_count(heightmap, heightmap_leaves, local_start, area_size, average_height),
+    }
+    return average_height, edit_counts
@@ -0,0 +1,124 @@
+from gdpc import Block, Box
+from gdpc.geometry import placeBox
+
+from log_cabin.cabin import cabin_footprint, choose_cabin_design
+from log_cabin.flatten import WOOD_TYPES, average_ground_height, column_spans, legacy_flatten_edit_count, plan_flatten_spans
+
+#Foundations that keep the natural terrain. Instead of levelling the whole pad, the cabin's floor is
+#raised to the highest ground under its walls and carried on log stilts, or on a stone plinth stepping
+#down with the ground when the floor sits low. Only the columns under the cabin are edited: trees in
+#the way are cleared, the supports are filled in and the floor is laid over the footprint.
+#A site plan is a dict with the foundation, the floor height, the spans to write (the format
+#plan_flatten_spans returns) and the floor as ((x, z), (size x, size z)), for flattening or raising alike.
+
+FOUNDATIONS = ("flatten", "raised", "auto")
+STILT_BLOCK = "minecraft:spruce_log"
+PLINTH_BLOCK = "minecraft:stone_bricks"
+#Blocks between stilts along the footprint's edges, the corners always get one
+STILT_SPACING = 3
+#A floor no more than this many blocks above the ground under it rests on a plinth instead of stilts
+PLINTH_MAX_HEIGHT = 2
+
+
+#Function which works out the spans that raise a floor over a footprint of footprint_size at footprint_origin
+#heightmap_leaves is the top columns are cleared from, see surface_top
+#Returns the floor height, "stilts" or "plinth" and the spans in global co-ordinates
+def plan_raised_spans(buildRect, heightmap, heightmap_leaves, footprint_origin, footprint_size):
+    local_start = (footprint_origin[0] - buildRect.begin.x, footprint_origin[1] - buildRect.begin.y)
+    window = (slice(local_start[0], local_start[0] + footprint_size[0]), slice(local_start[1], local_start[1] + footprint_size[1]))
+    #The floor replaces the highest ground block, every other column has a gap under it
+    floor_height = int(heightmap[window].max()) - 1
+    kind = "plinth" if floor_height - int(heightmap[window].min()) <= PLINTH_MAX_HEIGHT else "stilts"
+    edge_x = set(range(0, footprint_size[0], STILT_SPACING)) | {footprint_size[0] - 1}
+    edge_z = set(range(0, footprint_size[1], STILT_SPACING)) | {footprint_size[1] - 1}
+
+    def is_support(x, z):
+        on_x_edge = x in (0, footprint_size[0] - 1)
+        on_z_edge = z in (0, footprint_size[1] - 1)
+        if kind == "plinth":
+            return on_x_edge or on_z_edge
+        return (on_x_edge and z in edge_z) or (on_z_edge and x in edge_x)
+
+    def column_edits(local_x, local_z):
+        column = []
+        # Trees, leaves and plants over the footprint are cleared down to just above the floor
+        top = int(heightmap_leaves[local_x, local_z])
+        if top > floor_height + 1:
+            column.append((floor_height + 1, top, "minecraft:air"))
+        # Supports stand on the ground and reach up to the floor, which is placed separately
+        ground = int(heightmap[local_x, local_z])
+        if ground < floor_height and is_support(local_x - local_start[0], local_z - local_start[1]):
+            column.append((ground, floor_height, STILT_BLOCK if kind == "stilts" else PLINTH_BLOCK))
+        return column
+
+    return floor_height, kind, column_spans(buildRect, local_start, footprint_size, column_edits)
+
+
+#Function which plans the pad for a cabin of design on the site at optimal_coords
+#foundation "flatten" levels the whole pad, "raised" keeps the terrain under a raised floor and "auto"
+#takes whichever writes fewer blocks, flattening on a tie
+def plan_site(buildRect, heightmap, heightmap_leaves, optimal_coords, design, area_size=(15, 15), foundation="flatten"):
+    if foundation not in FOUNDATIONS:
+        raise ValueError(f"Unknown foundation {foundation!r}, expected one of {', '.join(FOUNDATIONS)}")
+    plans = []
+    if foundation != "raised":
+        average_height, spans = plan_flatten_spans(buildRect, heightmap, heightmap_leaves, optimal_coords, area_size)
+        plans.append({"foundation": "flatten", "base_height": average_height, "spans": spans,
+                      "floor": (tuple(optimal_coords), tuple(area_size))})
+    if foundation != "flatten":
+        footprint_origin = (optimal_coords[0] + design.offset[0], optimal_coords[1] + design.offset[1])
+        footprint_size = cabin_footprint(design)
+        floor_height, kind, spans = plan_raised_spans(buildRect, heightmap, heightmap_leaves, footprint_origin, footprint_size)
+        plans.append({"foundation": kind, "base_height": floor_height, "spans": spans, "floor": (footprint_origin, footprint_size)})
+    return min(plans, key=site_plan_blocks)
+
+
+#Function which makes the random choices for a site, the floor wood then the cabin design, and plans its pad
+#Returns (wood_choice, design, plan)
+def plan_cabin_site(buildRect, heightmap, heightmap_leaves, optimal_coords, rng, area_size=(15, 15), footprint=None, wall_height=None,
+                    foundation="flatten"):
+    wood_choice = rng.choice(WOOD_TYPES)
+    design = choose_cabin_design(area_size, rng, footprint, wall_height)
+    return wood_choice, design, plan_site(buildRect, heightmap, heightmap_leaves, optimal_coords, design, area_size, foundation)
+
+
+#Function which returns the blocks a site plan writes, spans and floor
+def site_plan_blocks(plan):
+    floor_size = plan["floor"][1]
+    return sum((y_end - y_begin) * z_size for _, _, z_size, y_begin, y_end, _ in plan["spans"]) + floor_size[0] * floor_size[1]
+
+
+#Function which summarises what a site plan would write, without writing anything
+def site_plan_summary(plan):
+    air = sum((y_end - y_begin) * z_size for _, _, z_size, y_begin, y_end, block_id in plan["spans"] if block_id == "minecraft:air")
+    floor = plan["floor"][1][0] * plan["floor"][1][1]
+    blocks = site_plan_blocks(plan)
+    return {
+        "foundation": plan["foundation"],
+        "base_height": plan["base_height"],
+        "spans": len(plan["spans"]),
+        "air_blocks": air,
+        "fill_blocks": blocks - air - floor,
+        "floor_blocks": floor,
+        "blocks": blocks,
+    }
+
+
+#Function which writes a site plan's spans and floor, returns the floor height and the edit counts
+def build_site(editor, buildRect, heightmap, heightmap_leaves, optimal_coords, plan, wood_choice, area_size=(15, 15)):
+    edits = 0
+    for x, z, z_size, y_begin, y_end, block_id in plan["spans"]:
+        placeBox(editor, Box((x, y_begin, z), (1, y_end - y_begin, z_size)), Block(block_id))
+        edits += (y_end - y_begin) * z_size
+    (floor_x, floor_z), floor_size = plan["floor"]
+    placeBox(editor, Box((floor_x, plan["base_height"], floor_z), (floor_size[0], 1, floor_size[1])), Block(wood_choice))
+    edits += floor_size[0] * floor_size[1]
+
+    local_start = (optimal_coords[0] - buildRect.begin.x, optimal_coords[1] - buildRect.begin.y)
+    average_height = average_ground_height(heightmap, local_start, area_size)
+    edit_counts = {
+        "blocks": edits,
+        "legacy_blocks": legacy_flatten_edit_count(heightmap, heightmap_leaves, local_start, area_size, average_height),
+        "foundation": plan["foundation"],
+    }
+    return plan["base_height"], edit_counts
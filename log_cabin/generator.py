@@ -0,0 +1,193 @@
+import random
+from collections import namedtuple
+from contextlib import nullcontext
+
+import numpy as np
+from gdpc import Editor, Rect
+
+from log_cabin.cabin import cabin_origin, footprint_pad
+from log_cabin.flatten import find_minimum_edit_spot, surface_top
+from log_cabin.foundation import build_site, plan_cabin_site
+from log_cabin.metrics import instrument_editor
+from log_cabin.mock import MockEditor, MockWorld, generate_world
+from log_cabin.pipeline import WritePipeline, terrain_edits
+from log_cabin.rasters import TerrainRasters
+from log_cabin.structure import place_structure, site_blueprint
+from log_cabin.terrain import NO_SITE, find_largest_building_spot, find_optimal_building_spot, water_mask_from_world_slice
+from log_cabin.tiles import find_optimal_building_spot_tiled
+from log_cabin.variants import VariantCache
+
+#The generator as library calls: open an editor, load the terrain, find a site and build on it.
+#Every step takes what it needs as parameters and returns its results, nothing is printed, so a
+#long-lived worker can import this once and build again and again with the same editor and caches.
+#metrics, when given, is a RunMetrics each step records its phases in.
+
+#Highest window variance a site may have, alter to preference for experimentation
+VARIANCE_THRESHOLD = 10.0
+PAD_SIZE = (15, 15)
+
+#Heightmaps, water and rasters of a loaded build area. world_slice is None when they came from a cache.
+#heightmap_leaves is the surface top flattening clears from, leaves and plants included, see surface_top.
+Terrain = namedtuple("Terrain", ["heightmap", "heightmap_leaves", "water_mask", "rasters", "world_slice"])
+
+
+def _phase(metrics, name):
+    return nullcontext() if metrics is None else metrics.phase(name)
+
+
+#Function which returns a write pipeline around a GDMC HTTP editor, or around an in-memory world
+#when offline (loaded from world_path, or generated from seed at offline_size). snapshot, a Snapshot,
+#is given the original state of every block the pipeline writes.
+def open_editor(offline=False, world_path=None, offline_size=(128, 128), seed=0, batch_size=4096, in_flight=2, retries=4,
+                snapshot=None):
+    if offline:
+        world = MockWorld.load(world_path) if world_path else generate_world(tuple(offline_size), seed=seed)
+        editor = MockEditor(world, buffering=True)
+    else:
+        editor = Editor(buffering=True)
+    return WritePipeline(instrument_editor(editor), batch_size=batch_size, in_flight=in_flight, retries=retries, snapshot=snapshot)
+
+
+#Function which loads the heightmaps and water of buildRect, from slice_cache when one is given,
+#and seeds the editor's local world model with the slice when one was loaded. compact keeps the
+#rasters as int16 heights and int32 scores, see TerrainRasters. area_size is the pad the rasters score.
+def load_terrain(editor, buildRect, slice_cache=None, metrics=None, compact=False, area_size=PAD_SIZE):
+    with _phase(metrics, "slice_load"):
+        if slice_cache is not None:
+            heightmaps, water_mask, worldSlice = slice_cache.load(editor, buildRect)
+        else:
+            worldSlice = editor.loadWorldSlice(buildRect)
+            heightmaps = worldSlice.heightmaps
+            #Water and other liquids are read from the slice we already have, not block by block from the server
+            water_mask = water_mask_from_world_slice(worldSlice, heightmaps["MOTION_BLOCKING_NO_LEAVES"])
+        if worldSlice is not None:
+            editor.local_world.add_slice(worldSlice)
+
+    heightmap = heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+    heightmap_top = surface_top(heightmaps)
+    #Variance, slope, water and flatten cost rasters are computed at most once, when first needed
+    rasters = TerrainRasters(heightmap, water_mask, area_size, heightmap_leaves=heightmap_top,
+                             cache_directory=slice_cache.raster_directory(buildRect) if slice_cache is not None else None,
+                             compact=compact)
+    return Terrain(heightmap, heightmap_top, water_mask, rasters, worldSlice)
+
+
+#Function which finds the site for one cabin on a pad of area_size. terrain is None in tiled mode, where
+#the build area is streamed in tile_size tiles. site_score "edits" picks the site flattening writes fewest blocks to.
+#Returns (site, variance, predicted edits or None), site is None when nothing is suitable.
+def find_site(editor, buildRect, terrain=None, variance_threshold=VARIANCE_THRESHOLD, site_score="variance", tile_size=None,
+              metrics=None, area_size=PAD_SIZE):
+    predicted_edits = None
+    with _phase(metrics, "site_search"):
+        if terrain is None:
+            optimal_spot, variance = find_optimal_building_spot_tiled(editor, buildRect, area_size, tile_size=tile_size)
+        elif site_score == "edits":
+            #Fewest blocks written among the dry sites under the variance threshold
+            optimal_spot, predicted_edits = find_minimum_edit_spot(buildRect, terrain.rasters, variance_threshold)
+            variance = float("inf")
+            if optimal_spot:
+                scores = terrain.rasters.get("scores")
+                variance = float(scores[optimal_spot[0] - buildRect.begin.x, optimal_spot[1] - buildRect.begin.y]) / terrain.rasters.score_scale
+        elif terrain.rasters.compact:
+            #One pass over the exact int32 scores, the pyramid's float64 levels would cost more than the map
+            scores = terrain.rasters.get("scores")
+            optimal_spot, variance = None, float("inf")
+            if scores.size:
+                best = np.unravel_index(np.argmin(scores), scores.shape)
+                if scores[best] != NO_SITE:
+                    optimal_spot = (buildRect.begin.x + int(best[0]), buildRect.begin.y + int(best[1]))
+                    variance = int(scores[best]) / terrain.rasters.score_scale
+        else:
+            #Coarse-to-fine search, regions that cannot get under the threshold are never scored in full
+            optimal_spot, variance = find_optimal_building_spot(editor, buildRect, terrain.heightmap, area_size, water_mask=terrain.water_mask,
+                                                                pyramid=True, variance_threshold=variance_threshold)
+    return optimal_spot, variance, predicted_edits
+
+
+#Function which finds the site for the largest of several cabin footprints (length, width) that fits
+#anywhere in the build area, scoring the pads of every footprint from the same terrain sums.
+#Returns (site, footprint, variance), site and footprint are None when no footprint fits.
+def find_largest_site(buildRect, terrain, footprints, variance_threshold=VARIANCE_THRESHOLD, metrics=None):
+    with _phase(metrics, "site_search"):
+        optimal_spot, index, variance = find_largest_building_spot(buildRect, terrain.heightmap, terrain.water_mask,
+                                                                   [footprint_pad(footprint) for footprint in footprints],
+                                                                   variance_threshold)
+    return optimal_spot, None if index is None else tuple(footprints[index]), variance
+
+
+#Function which finds a dry site for a raised floor when none is flat enough to flatten: the one with
+#the smallest height range, so its supports are the shortest.
+#Returns (site, height range), site is None when every window touches water.
+def find_raised_site(buildRect, terrain, metrics=None):
+    with _phase(metrics, "site_search"):
+        ranges = terrain.rasters.get("height_range")
+        if ranges.size == 0:
+            return None, None
+        ranges = np.where(terrain.rasters.get("wet"), np.inf, ranges)
+        best = np.unravel_index(np.argmin(ranges), ranges.shape)
+        if not np.isfinite(ranges[best]):
+            return None, None
+    return (buildRect.begin.x + int(best[0]), buildRect.begin.y + int(best[1])), int(ranges[best])
+
+
+#Function which loads just the site, for builds whose build area was never held as one world slice
+#Returns (siteRect, heightmap, heightmap_leaves)
+def load_site(editor, optimal_spot, area_size=PAD_SIZE, metrics=None):
+    with _phase(metrics, "slice_load"):
+        siteRect = Rect(optimal_spot, area_size)
+        worldSlice = editor.loadWorldSlice(siteRect)
+        editor.local_world.add_slice(worldSlice)
+    return siteRect, worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"], surface_top(worldSlice.heightmaps)
+
+
+#Function which lays the site's foundation and builds a cabin on it. The floor wood and the design are
+#drawn from rng in that order. foundation "flatten" levels the pad, "raised" keeps the terrain under a
+#raised floor and "auto" takes whichever writes fewer blocks, see log_cabin.foundation.
+#bulk sends pad and cabin as one structure request instead of block writes, bake returns that structure
+#as a blueprint without needing bulk. terrain_updates=False lays the foundation without neighbour updates.
+#footprint (length, width) and wall_height fix the cabin's size on a pad of area_size, see choose_cabin_design.
+#Returns a dict with the floor height, the design, the foundation used, the blocks written, the foundation
+#edit counts (None in bulk mode) and the baked site blueprint (None unless bulk or bake).
+def build_cabin_site(editor, buildRect, heightmap, heightmap_leaves, optimal_spot, rng=random, variant_cache=None,
+                     bulk=False, bake=False, terrain_updates=True, area_size=PAD_SIZE, metrics=None, footprint=None, wall_height=None,
+                     foundation="flatten"):
+    if variant_cache is None:
+        variant_cache = VariantCache()
+    wood_choice, design, plan = plan_cabin_site(buildRect, heightmap, heightmap_leaves, optimal_spot, rng, area_size,
+                                                footprint, wall_height, foundation)
+    #In bulk mode the pad is baked into the site structure with the cabin and placed with it
+    base_height = plan["base_height"]
+    flatten_edits = None
+    if not bulk:
+        with _phase(metrics, "flatten"), terrain_edits(editor, terrain_updates):
+            base_height, flatten_edits = build_site(editor, buildRect, heightmap, heightmap_leaves, optimal_spot, plan,
+                                                    wood_choice, area_size)
+
+    #The cabin stands on the new floor. Its blocks are checked against the local world model,
+    #which already holds the edited terrain, so the area is not loaded again
+    floor_origin = (optimal_spot[0], base_height + 1, optimal_spot[1])
+    blueprint = variant_cache.get(design)
+    site = None
+    if bulk or bake:
+        site, _ = site_blueprint(buildRect, heightmap, heightmap_leaves, optimal_spot, wood_choice,
+                                 blueprint, cabin_origin(design, floor_origin), area_size, plan)
+
+    if bulk:
+        #Pad and cabin go to the server as one structure file
+        with _phase(metrics, "structure"):
+            blocks_written = place_structure(editor, site, do_block_updates=terrain_updates)
+    else:
+        #Walls, doors, roof, windows and interior are written stage by stage, each grouped by chunk
+        blocks_written = 0
+        for stage in blueprint.used_stages():
+            with _phase(metrics, stage):
+                blocks_written += blueprint.write(editor, cabin_origin(design, floor_origin), stage)
+    return {
+        "base_height": base_height,
+        "design": design,
+        "foundation": plan["foundation"],
+        "blueprint": blueprint,
+        "blocks_written": blocks_written,
+        "flatten_edits": flatten_edits,
+        "site": site,
+    }
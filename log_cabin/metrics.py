@@ -0,0 +1,135 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from gdpc import interface
+
+#Per-phase metrics for a build: wall time, blocks written and read, HTTP requests and request bytes.
+#A MockEditor counts its own traffic in editor.stats. For a real Editor, instrument_editor wraps the
+#editor's block calls and gdpc's HTTP request function so the same counters are kept.
+
+_http = {"requests": 0, "bytes_sent": 0}
+_http_lock = threading.Lock()
+_original_request = None
+
+
+def _counting_request(method, url, *args, **kwargs):
+    data = kwargs.get("data")
+    with _http_lock:
+        _http["requests"] += 1
+        _http["bytes_sent"] += len(data) if data is not None else 0
+    return _original_request(method, url, *args, **kwargs)
+
+
+#Function which makes a real Editor keep the same stats dictionary a MockEditor does
+def instrument_editor(editor):
+    global _original_request
+    if hasattr(editor, "stats"):
+        return editor
+    if _original_request is None:
+        _original_request = interface._request
+        interface._request = _counting_request
+
+    editor.stats = {"block_reads": 0, "block_writes": 0}
+    place = editor._placeSingleBlockGlobal
+    get = editor.getBlockGlobal
+
+    def counted_place(position, block, replace=None):
+        editor.stats["block_writes"] += 1
+        return place(position, block, replace)
+
+    def counted_get(position):
+        editor.stats["block_reads"] += 1
+        return get(position)
+
+    editor._placeSingleBlockGlobal = counted_place
+    editor.getBlockGlobal = counted_get
+    return editor
+
+
+#Function which returns the current traffic counters of an editor
+def read_counters(editor):
+    stats = getattr(editor, "stats", {})
+    counters = {"block_writes": stats.get("block_writes", 0), "block_reads": stats.get("block_reads", 0)}
+    if "requests" in stats:
+        counters["requests"] = stats["requests"]
+        counters["bytes_sent"] = stats.get("bytes_sent", 0)
+    else:
+        with _http_lock:
+            counters["requests"] = _http["requests"]
+            counters["bytes_sent"] = _http["bytes_sent"]
+    return counters
+
+
+class RunMetrics:
+    #profile_dir writes a cProfile dump per phase. flush_each_phase sends buffered blocks at the end
+    #of every phase, so writes are charged to the phase that made them instead of a later flush.
+    def __init__(self, editor, profile_dir=None, flush_each_phase=False):
+        self.editor = editor
+        self.profile_dir = profile_dir
+        self.flush_each_phase = flush_each_phase
+        self.phases = []
+        if profile_dir is not None:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    @contextmanager
+    def phase(self, name):
+        before = read_counters(self.editor)
+        profiler = cProfile.Profile() if self.profile_dir is not None else None
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+            if self.flush_each_phase and hasattr(self.editor, "flushBuffer"):
+                self.editor.flushBuffer()
+                self.editor.awaitBufferFlushes()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+            after = read_counters(self.editor)
+            record = {"phase": name, "seconds": time.perf_counter() - start}
+            record.update({counter: after[counter] - before[counter] for counter in after})
+            self.phases.append(record)
+
+    def totals(self):
+        totals = {}
+        for record in self.phases:
+            for counter, value in record.items():
+                if counter != "phase":
+                    totals[counter] = totals.get(counter, 0) + value
+        return totals
+
+    def report(self):
+        lines = [f"{'phase':<16} {'seconds':>9} {'writes':>8} {'reads':>8} {'requests':>9} {'bytes':>10}"]
+        for record in self.phases + [dict(phase="total", **self.totals())]:
+            lines.append(f"{record['phase']:<16} {record['seconds']:>9.4f} {record['block_writes']:>8} "
+                         f"{record['block_reads']:>8} {record['requests']:>9} {record['bytes_sent']:>10}")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        with open(path, "w") as file:
+            json.dump({"phases": self.phases, "totals": self.totals()}, file, indent=2)
+
+    #Function which returns the phases in OpenMetrics text format, one gauge per counter labelled by phase
+    def to_openmetrics(self, prefix="log_cabin"):
+        counters = ["seconds", "block_writes", "block_reads", "requests", "bytes_sent"]
+        lines = []
+        for counter in counters:
+            name = f"{prefix}_phase_{counter}"
+            lines.append(f"# TYPE {name} gauge")
+            for record in self.phases:
+                lines.append(f'{name}{{phase="{record["phase"]}"}} {record.get(counter, 0)}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path, format="json"):
+        if format == "openmetrics":
+            with open(path, "w") as file:
+                file.write(self.to_openmetrics())
+        else:
+            self.write_json(path)
@@ -0,0 +1,384 @@
+import json
+import random
+import threading
+
+import numpy as np
+from gdpc import Block, Box, Rect, Transform
+from gdpc.block import transformedBlockOrPalette
+
+from log_cabin.palette import block_from_key, block_key
+from log_cabin.structure import blueprint_from_structure
+
+#In-memory stand-in for the GDMC HTTP interface.
+#MockWorld keeps a palette-indexed uint16 voxel grid, MockEditor answers the Editor calls the
+#generator makes (build area, world slices, heightmaps, getBlock, buffered placeBlock) against it.
+#Everything runs in process, so whole builds are deterministic and need no Minecraft server.
+
+AIR_IDS = {"minecraft:air", "minecraft:cave_air", "minecraft:void_air"}
+FLUID_IDS = {"minecraft:water", "minecraft:lava", "minecraft:bubble_column"}
+#Plants that always hold water, they count as fluid without blocking motion
+WATER_PLANT_IDS = {"minecraft:seagrass", "minecraft:tall_seagrass", "minecraft:kelp", "minecraft:kelp_plant"}
+#Non-air blocks that do not block motion, so they only show up in WORLD_SURFACE
+PASSABLE_IDS = {
+    "minecraft:short_grass", "minecraft:grass", "minecraft:tall_grass", "minecraft:fern",
+    "minecraft:dandelion", "minecraft:poppy", "minecraft:torch", "minecraft:snow",
+} | WATER_PLANT_IDS
+HEIGHTMAP_TYPES = ["MOTION_BLOCKING", "MOTION_BLOCKING_NO_LEAVES", "OCEAN_FLOOR", "WORLD_SURFACE"]
+
+
+#Function which makes rolling terrain: a few octaves of upsampled noise around sea level
+def synthetic_heightmap(size, seed=0, base_height=64, amplitude=12):
+    size_x, size_z = (size, size) if np.isscalar(size) else size
+    rng = np.random.default_rng(seed)
+    heights = np.zeros((size_x, size_z))
+    for cell, weight in ((64, 1.0), (16, 0.35), (4, 0.1)):
+        coarse = rng.standard_normal((-(-size_x // cell) + 1, -(-size_z // cell) + 1))
+        heights += weight * np.kron(coarse, np.ones((cell, cell)))[:size_x, :size_z]
+    return (base_height + amplitude * heights).astype(np.int64)
+
+
+class MockWorld:
+    def __init__(self, origin, size, y_begin=0, y_size=192):
+        self.origin = (int(origin[0]), int(origin[1]))
+        self.y_begin = y_begin
+        self.palette = ["minecraft:air"]
+        self._palette_index = {"minecraft:air": 0}
+        self._blocks = [Block("minecraft:air")]
+        self.grid = np.zeros((size[0], y_size, size[1]), dtype=np.uint16)
+
+    @property
+    def rect(self):
+        return Rect(self.origin, (self.grid.shape[0], self.grid.shape[2]))
+
+    @property
+    def box(self):
+        return self.rect.toBox(self.y_begin, self.grid.shape[1])
+
+    def palette_id(self, block):
+        key = block_key(block)
+        index = self._palette_index.get(key)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(key)
+            self._palette_index[key] = index
+            self._blocks.append(block_from_key(key))
+        return index
+
+    def local(self, position):
+        return (int(position[0]) - self.origin[0], int(position[1]) - self.y_begin, int(position[2]) - self.origin[1])
+
+    def contains(self, position):
+        return all(0 <= value < size for value, size in zip(self.local(position), self.grid.shape))
+
+    def get(self, position):
+        if not self.contains(position):
+            return Block("minecraft:void_air")
+        block = self._blocks[self.grid[self.local(position)]]
+        return Block(block.id, dict(block.states))
+
+    def set(self, position, block):
+        if self.contains(position):
+            self.grid[self.local(position)] = self.palette_id(block)
+
+    #Function which computes the four heightmaps for the given local x/z slices of the grid
+    #Values follow the server: one above the highest matching block, or y_begin for an empty column
+    def heightmaps(self, x_slice=slice(None), z_slice=slice(None), heightmapTypes=None):
+        ids = [key.split("[")[0] for key in self.palette]
+        is_air = np.array([block_id in AIR_IDS for block_id in ids])
+        is_liquid = np.array([block_id in FLUID_IDS for block_id in ids])
+        is_passable = np.array([block_id in PASSABLE_IDS for block_id in ids])
+        is_leaves = np.array([block_id.endswith("_leaves") for block_id in ids])
+        has_fluid = is_liquid | np.array([
+            block_id in WATER_PLANT_IDS or "waterlogged=true" in key for block_id, key in zip(ids, self.palette)
+        ])
+        solid = ~is_air & ~is_passable & ~is_liquid
+        lookups = {
+            "WORLD_SURFACE": ~is_air,
+            "MOTION_BLOCKING": solid | has_fluid,
+            "MOTION_BLOCKING_NO_LEAVES": (solid | has_fluid) & ~is_leaves,
+            "OCEAN_FLOOR": solid,
+        }
+        region = self.grid[x_slice, :, z_slice]
+        result = {}
+        for name in (HEIGHTMAP_TYPES if heightmapTypes is None else heightmapTypes):
+            matches = lookups[name][region]
+            top = matches.shape[1] - np.argmax(matches[:, ::-1, :], axis=1)
+            result[name] = np.where(matches.any(axis=1), top, 0).astype(np.int_) + self.y_begin
+        return result
+
+    def save(self, path):
+        np.savez_compressed(path, grid=self.grid, palette=np.array(self.palette),
+                            origin=np.array(self.origin), y_begin=np.array(self.y_begin))
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as data:
+            grid = data["grid"]
+            world = MockWorld(tuple(data["origin"]), (grid.shape[0], grid.shape[2]), int(data["y_begin"]), grid.shape[1])
+            for key in data["palette"][1:]:
+                world.palette_id(block_from_key(str(key)))
+        world.grid = grid
+        return world
+
+
+#Function which generates a small overworld: stone, dirt and grass over noise terrain, water up
+#to sea level, sand shores, trees with leaf canopies and some short grass
+def generate_world(size=(128, 128), seed=0, origin=(0, 0), sea_level=62, y_begin=0, y_size=192, tree_density=0.004):
+    rng = np.random.default_rng(seed)
+    world = MockWorld(origin, size, y_begin, y_size)
+    ground = np.clip(synthetic_heightmap(size, seed=seed, base_height=sea_level + 8), y_begin + 5, y_begin + y_size - 20) - y_begin
+    ys = np.arange(y_size)[None, :, None]
+    top = ground[:, None, :]
+    under_water = top <= sea_level - y_begin
+
+    stone, dirt, grass, sand, water = (world.palette_id(Block(name)) for name in
+                                       ("stone", "dirt", "grass_block", "sand", "water"))
+    grid = world.grid
+    grid[ys < top - 4] = stone
+    grid[(ys >= top - 4) & (ys < top)] = dirt
+    surface = (ys == top - 1)
+    grid[np.broadcast_to(surface & ~under_water, grid.shape)] = grass
+    grid[np.broadcast_to(surface & under_water, grid.shape)] = sand
+    grid[np.broadcast_to((ys >= top) & (ys <= sea_level - y_begin) & under_water, grid.shape)] = water
+
+    log, leaves, short_grass = (world.palette_id(Block(name)) for name in ("oak_log", "oak_leaves", "short_grass"))
+    land = ground > sea_level - y_begin + 1
+    for x, z in zip(*np.nonzero(land & (rng.random(ground.shape) < tree_density))):
+        base = int(ground[x, z])
+        trunk = int(rng.integers(4, 7))
+        for dy in (trunk - 2, trunk - 1, trunk, trunk + 1):
+            radius = 2 if dy < trunk else 1
+            grid[max(x - radius, 0):x + radius + 1, base + dy, max(z - radius, 0):z + radius + 1] = leaves
+        grid[x, base:base + trunk, z] = log
+    plants = land & (rng.random(ground.shape) < 0.05)
+    for x, z in zip(*np.nonzero(plants)):
+        if grid[x, ground[x, z], z] == 0:
+            grid[x, ground[x, z], z] = short_grass
+    return world
+
+
+class MockWorldSlice:
+    def __init__(self, world, rect, heightmapTypes=None):
+        self._rect = Rect(rect.offset, rect.size)
+        self._y_begin = world.y_begin
+        x_slice = slice(rect.begin.x - world.origin[0], rect.end.x - world.origin[0])
+        z_slice = slice(rect.begin.y - world.origin[1], rect.end.y - world.origin[1])
+        #A slice is a snapshot, later edits to the world do not show through
+        self._world = MockWorld(rect.offset, tuple(rect.size), world.y_begin, world.grid.shape[1])
+        self._world.palette = list(world.palette)
+        self._world._palette_index = dict(world._palette_index)
+        self._world._blocks = list(world._blocks)
+        self._world.grid = world.grid[x_slice, :, z_slice].copy()
+        self._heightmaps = self._world.heightmaps(heightmapTypes=heightmapTypes)
+
+    def __repr__(self):
+        return f"MockWorldSlice{repr(self._rect)}"
+
+    @property
+    def rect(self):
+        return self._rect
+
+    @property
+    def box(self):
+        return self._world.box
+
+    @property
+    def yBegin(self):
+        return self._y_begin
+
+    @property
+    def ySize(self):
+        return self._world.grid.shape[1]
+
+    @property
+    def yEnd(self):
+        return self._y_begin + self.ySize
+
+    @property
+    def heightmaps(self):
+        return self._heightmaps
+
+    def getBlockGlobal(self, position):
+        return self._world.get(position)
+
+    def getBlock(self, position):
+        return self.getBlockGlobal((position[0] + self._rect.begin.x, position[1], position[2] + self._rect.begin.y))
+
+
+class MockEditor:
+    def __init__(self, world, buildArea=None, buffering=False, bufferLimit=1024, host="mock://in-memory"):
+        self.world = world
+        self.host = host
+        self.transform = Transform()
+        self.buffering = buffering
+        self.bufferLimit = bufferLimit
+        self.doBlockUpdates = True
+        self._buildArea = world.box if buildArea is None else buildArea
+        self._buffer = {}
+        self._worldSlice = None
+        self._worldSliceDecay = None
+        self._send_lock = threading.Lock()
+        #What the same calls would have cost against a real server
+        self.stats = {"requests": 0, "block_reads": 0, "block_writes": 0, "flushes": 0, "bytes_sent": 0}
+
+    def checkConnection(self):
+        self.stats["requests"] += 1
+
+    def getMinecraftVersion(self):
+        return "mock"
+
+    def getBuildArea(self):
+        self.stats["requests"] += 1
+        return Box(self._buildArea.offset, self._buildArea.size)
+
+    #Function which handles one GET /heightmap request for the build area
+    def getHeightmap(self, heightmapType="WORLD_SURFACE"):
+        self.stats["requests"] += 1
+        rect = self._buildArea.toRect()
+        x_slice = slice(rect.begin.x - self.world.origin[0], rect.end.x - self.world.origin[0])
+        z_slice = slice(rect.begin.y - self.world.origin[1], rect.end.y - self.world.origin[1])
+        return self.world.heightmaps(x_slice, z_slice, [heightmapType])[heightmapType]
+
+    @property
+    def worldSlice(self):
+        return self._worldSlice
+
+    def loadWorldSlice(self, rect=None, heightmapTypes=None, cache=False):
+        if rect is None:
+            rect = self.getBuildArea().toRect()
+        self.stats["requests"] += 1
+        worldSlice = MockWorldSlice(self.world, rect, heightmapTypes)
+        if cache:
+            self._worldSlice = worldSlice
+            self._worldSliceDecay = set()
+        return worldSlice
+
+    def updateWorldSlice(self):
+        if self._worldSlice is None:
+            raise RuntimeError("No world slice is cached. Call .loadWorldSlice() with cache=True first.")
+        return self.loadWorldSlice(self._worldSlice.rect, self._worldSlice.heightmaps.keys(), cache=True)
+
+    def getBlock(self, position):
+        block = self.getBlockGlobal(self.transform * position)
+        invTransform = ~self.transform
+        block.transform(invTransform.rotation, invTransform.flip)
+        return block
+
+    def getBlockGlobal(self, position):
+        position = tuple(int(value) for value in position)
+        self.stats["block_reads"] += 1
+        if self.buffering and position in self._buffer:
+            block = self._buffer[position]
+            return Block(block.id, dict(block.states), block.data)
+        if not (
+            self._worldSlice is not None
+            and self._worldSlice.box.contains(position)
+            and position not in self._worldSliceDecay
+        ):
+            self.stats["requests"] += 1
+        return self.world.get(position)
+
+    def placeBlock(self, position, block, replace=None):
+        if _is_single_position(position):
+            globalPosition = self.transform * position
+        else:
+            globalPosition = [self.transform * pos for pos in position]
+        globalBlock = transformedBlockOrPalette(block, self.transform.rotation, self.transform.flip)
+        return self.placeBlockGlobal(globalPosition, globalBlock, replace)
+
+    def placeBlockGlobal(self, position, block, replace=None):
+        if _is_single_position(position):
+            return self._placeSingleBlockGlobal(position, block, replace)
+        oldBuffering = self.buffering
+        self.buffering = True
+        for pos in position:
+            self._placeSingleBlockGlobal(pos, block, replace)
+        self.buffering = oldBuffering
+        return True
+
+    def _placeSingleBlockGlobal(self, position, block, replace=None):
+        position = tuple(int(value) for value in position)
+        if replace is not None:
+            if isinstance(replace, str):
+                replace = [replace]
+            if self.getBlockGlobal(position).id not in replace:
+                return True
+        if not isinstance(block, Block):
+            block = random.choice(block)
+        if not block.id:
+            return True
+
+        self.stats["block_writes"] += 1
+        if self.buffering:
+            if len(self._buffer) >= self.bufferLimit:
+                self.flushBuffer()
+            self._buffer.pop(position, None)
+            self._buffer[position] = block
+        else:
+            self.stats["requests"] += 1
+            self.stats["bytes_sent"] += _placement_size(position, block) + 2
+            self.world.set(position, block)
+        if self._worldSlice is not None:
+            self._worldSliceDecay.add(position)
+        return True
+
+    #Function which handles one placeBlocks request the way the server would, used by WritePipeline
+    #Requests can arrive from several threads, the server applies them one at a time
+    def sendBlocks(self, blocks, doBlockUpdates=True):
+        with self._send_lock:
+            blocks = list(blocks)
+            self.stats["requests"] += 1
+            self.stats["block_writes"] += len(blocks)
+            self.stats["bytes_sent"] += len(blocks) + 1
+            for position, block in blocks:
+                self.stats["bytes_sent"] += _placement_size(position, block)
+                self.world.set(position, block)
+                if self._worldSlice is not None:
+                    self._worldSliceDecay.add(tuple(position))
+        return [(True, 1)] * len(blocks)
+
+    #Function which handles one POST /structure request, the structure's voxel [0, 0, 0] goes at position
+    def placeStructure(self, structureData, position, doBlockUpdates=True):
+        blueprint = blueprint_from_structure(structureData)
+        x, y, z, ids = blueprint.placements(position)
+        with self._send_lock:
+            self.stats["requests"] += 1
+            self.stats["block_writes"] += len(ids)
+            self.stats["bytes_sent"] += len(structureData)
+            for placed in zip(x.tolist(), y.tolist(), z.tolist(), ids.tolist()):
+                self.world.set(placed[:3], blueprint.palette[placed[3]])
+                if self._worldSlice is not None:
+                    self._worldSliceDecay.add(placed[:3])
+
+    def flushBuffer(self):
+        if not self._buffer:
+            return
+        self.stats["requests"] += 1
+        self.stats["flushes"] += 1
+        self.stats["bytes_sent"] += len(self._buffer) + 1
+        for position, block in self._buffer.items():
+            self.stats["bytes_sent"] += _placement_size(position, block)
+            self.world.set(position, block)
+        self._buffer = {}
+
+    def awaitBufferFlushes(self, timeout=None):
+        pass
+
+
+#Function which returns the size of one block in a placeBlocks request body, as gdpc encodes it
+def _placement_size(position, block):
+    entry = f'{{"x":{position[0]},"y":{position[1]},"z":{position[2]},"id":"{block.id}"'
+    if block.states:
+        entry += f',"state":{json.dumps(block.states, separators=(",", ":"))}'
+    if block.data is not None:
+        entry += f',"data":{repr(block.data)}'
+    return len(entry.encode()) + 1
+
+
+def _is_single_position(position):
+    return (
+        hasattr(position, "__len__")
+        and len(position) == 3
+        and hasattr(position, "__getitem__")
+        and isinstance(position[0], (int, np.integer))
+    )
@@ -0,0 +1,26 @@
+from gdpc import Block
+
+#Block palette keys shared by the mock world and blueprints.
+#A key is the namespaced id plus the state string, the same text the server reports for a block.
+
+
+def namespaced(block_id):
+    return block_id if ":" in block_id else "minecraft:" + block_id
+
+
+#Function which returns the palette key of a block, matching what the server reports back
+def block_key(block):
+    return namespaced(block.id) + block.stateString()
+
+
+#Function which tells whether two blocks are the same block state, "oak_planks" and "minecraft:oak_planks" alike
+def same_block(block, other):
+    return namespaced(block.id) == namespaced(other.id) and block.states == other.states and block.data == other.data
+
+
+#Function which turns a palette key like "minecraft:oak_stairs[facing=east]" back into a Block
+def block_from_key(key):
+    if "[" not in key:
+        return Block(key)
+    block_id, states = key[:-1].split("[", 1)
+    return Block(block_id, dict(state.split("=", 1) for state in states.split(",")))
@@ -0,0 +1,95 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from log_cabin.cabin import cabin_origin, choose_cabin_design
+from log_cabin.flatten import WOOD_TYPES
+from log_cabin.foundation import build_site, plan_site
+from log_cabin.pipeline import terrain_edits
+from log_cabin.settlement import plot_size, task_rng
+from log_cabin.variants import VariantCache
+
+#Parallel settlement building: designs are generated in a process pool, one writer in the main
+#process flattens plots and writes blueprints to the editor in plot order.
+#Each plot draws from its own task_rng, so a settlement comes out the same whatever the worker count,
+#and the same as build_settlement builds in order.
+
+#One variant cache per worker process, created on first use
+_worker_cache = None
+
+
+#Function run in the worker processes: all random choices and the blueprint for one plot
+def generate_plot_design(task):
+    global _worker_cache
+    index, seed, area_size, footprint, wall_height, cache_directory = task
+    if _worker_cache is None:
+        _worker_cache = VariantCache(cache_directory)
+    rng = task_rng(seed, index)
+    wood_choice = rng.choice(WOOD_TYPES)
+    design = choose_cabin_design(area_size, rng, footprint, wall_height)
+    return wood_choice, design, _worker_cache.get(design)
+
+
+#Function run in the worker processes for a chunk of plots, so each round trip carries several designs
+def generate_plot_designs(tasks):
+    return [generate_plot_design(task) for task in tasks]
+
+
+#Function which builds a cabin on every plot, generating designs on `workers` processes
+#footprint and wall_height fix every cabin's size, see choose_cabin_design, foundation is as for plan_site
+#footprints, when given, holds each plot's own footprint as for build_settlement
+#Returns the built (plot, base_height, design) list and a report saying which side was the bottleneck
+def build_settlement_parallel(editor, buildRect, heightmap, heightmap_leaves, plots, seed=0, area_size=(15, 15), workers=None, cache_directory=None, chunksize=4, terrain_updates=True,
+                              footprint=None, wall_height=None, foundation="flatten", footprints=None):
+    workers = workers or os.cpu_count()
+    sizes = [plot_size(index, footprints, footprint, area_size) for index in range(len(plots))]
+    tasks = [(index, seed, sizes[index][1], sizes[index][0], wall_height, cache_directory) for index in range(len(plots))]
+
+    executor = None
+    if workers == 1:
+        results = map(generate_plot_design, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        #Submitted chunk by chunk like executor.map, but the futures are kept so the pending ones can be cancelled
+        futures = [executor.submit(generate_plot_designs, tasks[begin:begin + chunksize]) for begin in range(0, len(tasks), chunksize)]
+        results = (result for future in futures for result in future.result())
+
+    built = []
+    waiting = 0.0
+    writing = 0.0
+    start = time.perf_counter()
+    try:
+        for (optimal_spot, _), (_, plot_area) in zip(plots, sizes):
+            #Time blocked on the pool is generation the writer had to wait for
+            mark = time.perf_counter()
+            wood_choice, design, blueprint = next(results)
+            waiting += time.perf_counter() - mark
+
+            mark = time.perf_counter()
+            plan = plan_site(buildRect, heightmap, heightmap_leaves, optimal_spot, design, plot_area, foundation)
+            with terrain_edits(editor, terrain_updates):
+                base_height, _ = build_site(editor, buildRect, heightmap, heightmap_leaves, optimal_spot, plan, wood_choice, plot_area)
+            blueprint.write(editor, cabin_origin(design, (optimal_spot[0], base_height + 1, optimal_spot[1])))
+            writing += time.perf_counter() - mark
+            built.append((optimal_spot, base_height, design))
+
+        mark = time.perf_counter()
+        editor.flushBuffer()
+        editor.awaitBufferFlushes()
+        writing += time.perf_counter() - mark
+    finally:
+        if executor is not None:
+            #Designs not started yet are dropped, by hand as shutdown(cancel_futures=True) needs Python 3.9
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
+
+    report = {
+        "houses": len(built),
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+        "generation_wait_seconds": waiting,
+        "write_seconds": writing,
+        "bottleneck": "generation" if waiting > writing else "writer",
+    }
+    return built, report
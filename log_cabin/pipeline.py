@@ -0,0 +1,271 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+from gdpc import Block, Rect, interface
+from gdpc.block import transformedBlockOrPalette
+from gdpc.exceptions import InterfaceConnectionError
+
+from log_cabin.palette import same_block
+from log_cabin.world_model import LocalWorld
+
+#Write pipeline between the generator and the editor.
+#Placements are queued by position, so a later write to the same block replaces the earlier one.
+#A flush sorts the queue by chunk and sends it in batches from background threads: the generator
+#only waits when in_flight batches are already being sent. Batches that touch blocks still in flight
+#wait for those sends first, so the world always ends up with the last write to every block.
+#Every placement is recorded in a LocalWorld, which answers reads and drops writes of a block state
+#the target already holds. With a snapshot, the state each block had before its first write is kept in it.
+
+logger = logging.getLogger(__name__)
+
+
+#Function which orders positions chunk by chunk, then by height, so each batch touches few chunks
+def chunk_order(position):
+    return (position[0] >> 4, position[2] >> 4, position[1], position[2], position[0])
+
+
+class WritePipeline:
+    #The queue is flushed once it holds queue_limit blocks (four batches by default), so there is a
+    #wide span of placements to sort into chunks. in_flight=0 sends batches on the calling thread.
+    #backoff is the first retry delay in seconds, doubled on each retry.
+    def __init__(self, editor, batch_size=4096, in_flight=2, retries=4, backoff=0.5, do_block_updates=True, queue_limit=None,
+                 local_world=None, snapshot=None):
+        self.editor = editor
+        self.local_world = LocalWorld() if local_world is None else local_world
+        self.snapshot = snapshot
+        self.batch_size = batch_size
+        self.queue_limit = queue_limit or batch_size * 4
+        self.in_flight = in_flight
+        self.retries = retries
+        self.backoff = backoff
+        self._do_block_updates = do_block_updates
+        self._pending = {}
+        self._sending = {}
+        self._done = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=in_flight) if in_flight > 0 else None
+        if not hasattr(editor, "stats"):
+            editor.stats = {}
+        #Pipeline counters live next to the editor's traffic counters so metrics see both
+        self.stats = editor.stats
+        for counter in ("skipped_writes", "duplicate_writes", "batches", "retries", "failed_blocks"):
+            self.stats.setdefault(counter, 0)
+
+    #Everything the pipeline does not handle (build area, world slices, ...) goes to the editor
+    def __getattr__(self, name):
+        return getattr(self.editor, name)
+
+    @property
+    def transform(self):
+        return self.editor.transform
+
+    @property
+    def do_block_updates(self):
+        return self._do_block_updates
+
+    @do_block_updates.setter
+    def do_block_updates(self, value):
+        #Queued blocks keep the setting they were placed with
+        if value != self._do_block_updates:
+            self.flushBuffer()
+        self._do_block_updates = value
+
+    #Context manager for bulk edits, such as terrain, that do not need neighbour updates
+    @contextmanager
+    def block_updates(self, enabled):
+        previous = self.do_block_updates
+        self.do_block_updates = enabled
+        try:
+            yield self
+        finally:
+            self.do_block_updates = previous
+
+    def placeBlock(self, position, block, replace=None):
+        transform = self.transform
+        if _is_single_position(position):
+            globalPosition = transform * position
+        else:
+            globalPosition = [transform * pos for pos in position]
+        return self.placeBlockGlobal(globalPosition, transformedBlockOrPalette(block, transform.rotation, transform.flip), replace)
+
+    def placeBlockGlobal(self, position, block, replace=None):
+        if _is_single_position(position):
+            return self._placeSingleBlockGlobal(position, block, replace)
+        for pos in position:
+            self._placeSingleBlockGlobal(pos, block, replace)
+        return True
+
+    def _placeSingleBlockGlobal(self, position, block, replace=None):
+        position = (int(position[0]), int(position[1]), int(position[2]))
+        if replace is not None:
+            if isinstance(replace, str):
+                replace = [replace]
+            if self.getBlockGlobal(position).id not in replace:
+                return True
+        if not isinstance(block, Block):
+            block = random.choice(block)
+        if not block.id:
+            return True
+        current = self.local_world.getBlockGlobal(position)
+        if current is not None and same_block(current, block):
+            self.stats["skipped_writes"] += 1
+            return True
+        if self.snapshot is not None and position not in self.snapshot:
+            self.snapshot.capture(position, self._original_block(position) if current is None else current)
+        self.local_world.record(position, block)
+
+        if position in self._pending:
+            self.stats["duplicate_writes"] += 1
+        self._pending[position] = block
+        if len(self._pending) >= self.queue_limit:
+            self.flushBuffer()
+        return True
+
+    #Function which captures the blocks at positions in the snapshot before something other than
+    #placeBlock writes to them, such as a structure placement
+    def snapshot_blocks(self, positions):
+        if self.snapshot is None:
+            return
+        for position in positions:
+            position = (int(position[0]), int(position[1]), int(position[2]))
+            if position not in self.snapshot:
+                current = self.local_world.getBlockGlobal(position)
+                self.snapshot.capture(position, self._original_block(position) if current is None else current)
+
+    #Function which returns the block at a position outside every slice the local world holds. The
+    #position's chunk is loaded as a slice and kept, so a snapshot costs a request per chunk, not per block.
+    def _original_block(self, position):
+        chunk = Rect((position[0] >> 4 << 4, position[2] >> 4 << 4), (16, 16))
+        self.local_world.add_slice(self.editor.loadWorldSlice(chunk))
+        current = self.local_world.getBlockGlobal(position)
+        return self.editor.getBlockGlobal(position) if current is None else current
+
+    #Function which reads from the local world, so queued and in-flight writes are seen, and only
+    #asks the editor for blocks outside every seeded slice
+    def getBlockGlobal(self, position):
+        block = self.local_world.getBlockGlobal(position)
+        if block is None:
+            return self.editor.getBlockGlobal(position)
+        return Block(block.id, dict(block.states), block.data)
+
+    def getBlock(self, position):
+        block = self.getBlockGlobal(self.transform * position)
+        inverse = ~self.transform
+        block.transform(inverse.rotation, inverse.flip)
+        return block
+
+    #Function which sends everything queued, in chunk order and batch_size blocks at a time
+    #Returns once the batches are handed to the background threads
+    def flushBuffer(self):
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = {}
+        positions = sorted(pending, key=chunk_order)
+        for start in range(0, len(positions), self.batch_size):
+            batch = {position: pending[position] for position in positions[start:start + self.batch_size]}
+            self._submit(batch, self._do_block_updates)
+
+    def _submit(self, batch, do_block_updates):
+        if self._executor is None:
+            self._send(batch, do_block_updates)
+            return
+        #Wait for a free slot, and for any send that touches the same blocks
+        with self._lock:
+            sending = list(self._sending.items())
+        overlapping = [future for future, other in sending if not batch.keys().isdisjoint(other)]
+        if len(sending) >= self.in_flight:
+            wait([future for future, _ in sending], return_when="FIRST_COMPLETED")
+        wait(overlapping)
+        self._collect()
+
+        future = self._executor.submit(self._send, batch, do_block_updates)
+        with self._lock:
+            self._sending[future] = batch
+        future.add_done_callback(self._finished)
+
+    def _finished(self, future):
+        with self._lock:
+            self._sending.pop(future, None)
+            self._done.append(future)
+
+    #Function which raises the first error a finished background send ran into
+    def _collect(self):
+        with self._lock:
+            done = self._done
+            self._done = []
+        for future in done:
+            future.result()
+
+    def _send(self, batch, do_block_updates):
+        attempt = 0
+        while True:
+            try:
+                results = self._send_once(batch, do_block_updates)
+                break
+            except InterfaceConnectionError:
+                if attempt >= self.retries:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                time.sleep(self.backoff * 2 ** attempt)
+                attempt += 1
+        failed = [message for success, message in results if not success]
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["failed_blocks"] += len(failed)
+        if failed:
+            logger.error("Server failed to place %d of %d blocks, first error: %s", len(failed), len(batch), failed[0])
+
+    #One placeBlocks request. An editor with its own sendBlocks (the offline mock) takes the batch
+    #directly, a gdpc Editor's server is sent it through gdpc's interface.
+    def _send_once(self, batch, do_block_updates):
+        send_blocks = getattr(self.editor, "sendBlocks", None)
+        if send_blocks is not None:
+            return send_blocks(batch.items(), doBlockUpdates=do_block_updates)
+        results = interface.placeBlocks(batch.items(), dimension=self.editor.dimension, doBlockUpdates=do_block_updates,
+                                        spawnDrops=self.editor.spawnDrops, retries=0, timeout=self.editor.timeout,
+                                        host=self.editor.host)
+        with self._lock:
+            self.stats["block_writes"] = self.stats.get("block_writes", 0) + len(batch)
+        return results
+
+    #Function which waits for every background send to finish, raising the first error if one failed
+    def awaitBufferFlushes(self, timeout=None):
+        with self._lock:
+            futures = list(self._sending)
+        wait(futures, timeout)
+        for future in futures:
+            future.result()
+        self._collect()
+
+    #Function which flushes and waits, so everything placed so far is in the world
+    def close(self):
+        self.flushBuffer()
+        self.awaitBufferFlushes()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+#Function which returns a context for terrain edits, with neighbour updates turned off when
+#block_updates is False and the editor is a WritePipeline
+def terrain_edits(editor, block_updates=True):
+    if block_updates or not isinstance(editor, WritePipeline):
+        return nullcontext(editor)
+    return editor.block_updates(False)
+
+
+def _is_single_position(position):
+    return (
+        hasattr(position, "__len__")
+        and len(position) == 3
+        and hasattr(position, "__getitem__")
+        and isinstance(position[0], (int, np.integer))
+    )
@@ -0,0 +1,165 @@
+import os
+
+import numpy as np
+
+from log_cabin.flatten import window_flatten_edits
+from log_cabin.terrain import (
+    NO_SITE, compact_heights, compact_variance_map, pack_mask, summed_area_table, window_any, window_range, window_sums,
+    window_variance_map,
+)
+
+#Terrain rasters for a loaded build area, computed once and shared by the site search, the
+#settlement planner and exports. Window rasters are indexed [x, z] by the window's local start,
+#column rasters by the column, the same way as the heightmaps. Rendering is headless and only
+#imports matplotlib when a PNG is asked for. With a cache_directory, window rasters are saved there
+#once computed and memory-mapped back in by later runs on the same terrain.
+#In compact mode scores are int32: count^2 times the variance (score_scale), with NO_SITE for windows
+#touching water, and edit_scores use NO_SITE the same way. Ranking them is exact and needs no float64 rasters.
+
+#Rasters with one value per window start, the rest have one value per column
+WINDOW_RASTERS = ("variance", "slope", "height_range", "wet", "flatten_level", "flatten_cost", "scores", "edit_scores")
+COLUMN_RASTERS = ("water",)
+
+RASTER_TITLES = {
+    "variance": "Terrain Variance Evaluation",
+    "slope": "Mean Slope",
+    "height_range": "Height Range (raised floor drop)",
+    "wet": "Windows Containing Water",
+    "flatten_level": "Floor Height After Flattening",
+    "flatten_cost": "Blocks Written By Flattening",
+    "scores": "Site Scores (water excluded)",
+    "edit_scores": "Flattening Edits (water excluded)",
+    "water": "Water Mask",
+}
+
+
+class TerrainRasters:
+    #heightmap_leaves is the top flattening clears down from, canopies and plants included (see surface_top)
+    def __init__(self, heightmap, water_mask, area_size=(15, 15), heightmap_leaves=None, cache_directory=None, compact=False):
+        self.heightmap = heightmap
+        self.heightmap_leaves = heightmap if heightmap_leaves is None else heightmap_leaves
+        self.water_mask = water_mask
+        self.area_size = area_size
+        self.cache_directory = cache_directory
+        self.compact = compact
+        self._rasters = {}
+
+    #What scores are multiplied by compared with the variance
+    @property
+    def score_scale(self):
+        return (self.area_size[0] * self.area_size[1]) ** 2 if self.compact else 1
+
+    #Function which returns a raster at the given stride, computing it on first use only
+    def get(self, name, stride=1):
+        if name not in self._rasters:
+            raster = self._load(name)
+            if raster is None:
+                computed = set(self._rasters)
+                raster = getattr(self, f"_compute_{name}")()
+                self._rasters[name] = raster
+                for new in set(self._rasters) - computed:
+                    self._save(new)
+            self._rasters[name] = raster
+        return self._rasters[name][::stride, ::stride]
+
+    def _cache_path(self, name):
+        if self.cache_directory is None or name in COLUMN_RASTERS:
+            return None
+        suffix = "-compact" if self.compact else ""
+        return os.path.join(self.cache_directory, f"{name}-{self.area_size[0]}x{self.area_size[1]}{suffix}.npy")
+
+    def _load(self, name):
+        path = self._cache_path(name)
+        if path is None or not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def _save(self, name):
+        path = self._cache_path(name)
+        if path is not None and not os.path.exists(path):
+            os.makedirs(self.cache_directory, exist_ok=True)
+            np.save(path, self._rasters[name])
+
+    def _compute_variance(self):
+        return window_variance_map(self.heightmap, self.area_size)
+
+    def _compute_water(self):
+        return self.water_mask
+
+    def _compute_wet(self):
+        if self.get("variance").size == 0:
+            return np.empty((0, 0), dtype=bool)
+        return window_any(self.water_mask, self.area_size)
+
+    #Mean steepness of each window, from each column's height gradient
+    def _compute_slope(self):
+        if self.get("variance").size == 0:
+            return np.empty((0, 0))
+        gradient_x, gradient_z = np.gradient(self.heightmap.astype(np.float64))
+        steepness = np.hypot(gradient_x, gradient_z)
+        return window_sums(summed_area_table(steepness, dtype=np.float64), self.area_size) / (self.area_size[0] * self.area_size[1])
+
+    #Highest minus lowest column, how far a raised floor stands above the lowest ground
+    def _compute_height_range(self):
+        return window_range(self.heightmap, self.area_size)
+
+    #Level, air and dirt come out of one pass, the other two are kept as they are computed
+    def _compute_flatten_level(self):
+        levels, air, dirt = window_flatten_edits(self.heightmap, self.heightmap_leaves, self.area_size)
+        self._rasters["flatten_air"] = air
+        self._rasters["flatten_dirt"] = dirt
+        return levels
+
+    def _compute_flatten_air(self):
+        self._rasters["flatten_level"] = self._compute_flatten_level()
+        return self._rasters["flatten_air"]
+
+    def _compute_flatten_dirt(self):
+        self._rasters["flatten_level"] = self._compute_flatten_level()
+        return self._rasters["flatten_dirt"]
+
+    #Exact blocks flatten_build_area writes for each window: air cleared, dirt filled and the floor
+    def _compute_flatten_cost(self):
+        return self.get("flatten_air") + self.get("flatten_dirt") + self.area_size[0] * self.area_size[1]
+
+    def _compute_edit_scores(self):
+        if self.compact:
+            return np.where(self.get("scores") == NO_SITE, NO_SITE, self.get("flatten_cost")).astype(np.int32)
+        return np.where(self.get("wet"), np.inf, self.get("flatten_cost"))
+
+    #Variance with every window that touches water ruled out, what the site search minimises
+    def _compute_scores(self):
+        if self.compact:
+            return compact_variance_map(compact_heights(self.heightmap), self.area_size, pack_mask(self.water_mask))
+        return np.where(self.get("wet"), np.inf, self.get("variance"))
+
+    #Function which writes rasters to directory as .npy arrays or PNG images, returns the paths written
+    def export(self, directory, names=WINDOW_RASTERS + COLUMN_RASTERS, stride=1, format="png"):
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for name in names:
+            raster = self.get(name, stride)
+            if raster.dtype == np.int32 and name in ("scores", "edit_scores"):
+                raster = np.where(raster == NO_SITE, np.inf, raster / (self.score_scale if name == "scores" else 1))
+            path = os.path.join(directory, f"{name}.{format}")
+            if format == "npy":
+                np.save(path, raster)
+            else:
+                render_raster(raster, path, RASTER_TITLES[name], stride)
+            paths.append(path)
+        return paths
+
+
+#Function which saves a raster as a PNG, x across and z down like a map of the build area
+def render_raster(raster, path, title, stride=1):
+    #The figure is drawn off screen, nothing waits for a window to be closed
+    from matplotlib.figure import Figure
+
+    figure = Figure()
+    axes = figure.add_subplot()
+    image = axes.imshow(np.ma.masked_invalid(raster.T.astype(np.float64)), cmap="viridis", interpolation="nearest")
+    figure.colorbar(image, ax=axes)
+    axes.set_title(title)
+    axes.set_xlabel(f"X Coordinate / {stride}" if stride > 1 else "X Coordinate")
+    axes.set_ylabel(f"Z Coordinate / {stride}" if stride > 1 else "Z Coordinate")
+    figure.savefig(path)
@@ -0,0 +1,153 @@
+import random
+
+import numpy as np
+
+from log_cabin.cabin import cabin_origin, footprint_pad
+from log_cabin.foundation import build_site, plan_cabin_site
+from log_cabin.pipeline import terrain_edits
+from log_cabin.rasters import TerrainRasters
+from log_cabin.terrain import NO_SITE, multi_size_variance_maps, window_range
+from log_cabin.variants import VariantCache
+
+#Settlement mode: many non-overlapping cabins in one build area.
+#Every window is scored once, candidates are visited best first, and each accepted plot blocks
+#the window starts that would overlap it. Planning cost is one sort plus constant work per plot.
+
+
+#Function which returns the random generator for one plot of a seeded settlement. Every plot draws from
+#its own, so a settlement comes out the same built in order or on any number of worker processes.
+def task_rng(seed, index):
+    return random.Random(f"{seed}-{index}")
+
+
+#Function which returns (footprint, pad size) for plot index: its own footprint from footprints when given,
+#otherwise the settlement's footprint and pad
+def plot_size(index, footprints, footprint, area_size):
+    if footprints is None:
+        return footprint, area_size
+    return footprints[index], footprint_pad(footprints[index])
+
+
+#Function which picks up to house_count non-overlapping plots, flattest first
+#Returns a list of ((x, z), score) in the order they were chosen
+#Pass the run's TerrainRasters as rasters to reuse window scores that were already computed.
+#rank_by="edits" visits plots by the blocks flattening them would write instead of by variance,
+#the variance threshold still decides which windows are acceptable. compact ranks int32 scores, with the
+#same plots, when no rasters are passed. With a foundation other than "flatten", dry windows at or over the
+#threshold are used too once the acceptable ones run out, smallest height range first, for raised floors.
+def plan_settlement(buildRect, heightmap, water_mask, house_count, area_size=(15, 15), variance_threshold=10.0, spacing=2, rasters=None, rank_by="variance",
+                    compact=False, foundation="flatten"):
+    if rasters is None:
+        rasters = TerrainRasters(heightmap, water_mask, area_size, compact=compact)
+    variances = rasters.get("scores")
+    if variances.size == 0:
+        return []
+    scores = rasters.get("edit_scores") if rank_by == "edits" else variances
+    #Compact scores are variances times score_scale
+    reported_scale = rasters.score_scale if rank_by != "edits" else 1
+
+    #Rank every acceptable window once, ties go to the lowest x then z like the single-house search
+    candidates = np.flatnonzero(variances.ravel() < variance_threshold * rasters.score_scale)
+    if rasters.compact:
+        candidates = _rank_compact(candidates, scores.ravel())
+    else:
+        candidates = candidates[np.argsort(scores.ravel()[candidates], kind="stable")]
+    if foundation != "flatten":
+        #Too rough to flatten, a raised floor goes on the dry windows with the shortest supports
+        dry = variances.ravel() != (NO_SITE if rasters.compact else np.inf)
+        rough = np.flatnonzero(dry & (variances.ravel() >= variance_threshold * rasters.score_scale))
+        rough = rough[np.argsort(rasters.get("height_range").ravel()[rough], kind="stable")]
+        candidates = np.concatenate([candidates, rough])
+
+    #blocked[x, z] is True once a window starting there would overlap or crowd a chosen plot
+    blocked = np.zeros(scores.shape, dtype=bool)
+    plots = []
+    for index in candidates:
+        x, z = divmod(int(index), scores.shape[1])
+        if blocked[x, z]:
+            continue
+        plots.append(((buildRect.begin.x + x, buildRect.begin.y + z), float(scores[x, z]) / reported_scale))
+        if len(plots) == house_count:
+            break
+        _block_window_starts(blocked, (x, z), area_size, area_size, spacing)
+    return plots
+
+
+#Function which picks up to house_count non-overlapping plots for cabins of several footprints (length, width),
+#giving each location the largest footprint whose pad fits there. Every pad is scored from one set of
+#summed-area tables. The largest pad's acceptable windows are visited flattest first, then the next pad's
+#fill the room left between the plots already chosen, and so on down to the smallest.
+#foundation is as for plan_settlement, rough dry windows of the smallest pad are used once the rest run out.
+#Returns a list of ((x, z), variance, footprint) in the order they were chosen
+def plan_largest_settlement(buildRect, heightmap, water_mask, house_count, footprints, variance_threshold=10.0, spacing=2,
+                            foundation="flatten"):
+    footprints = sorted(dict.fromkeys(tuple(footprint) for footprint in footprints), key=lambda footprint: footprint[0] * footprint[1], reverse=True)
+    pads = [footprint_pad(footprint) for footprint in footprints]
+    chosen = []
+    plots = []
+    for footprint, pad, variances in zip(footprints, pads, multi_size_variance_maps(heightmap, water_mask, pads)):
+        if len(plots) == house_count:
+            break
+        if variances.size == 0:
+            continue
+        candidates = np.flatnonzero(variances.ravel() < variance_threshold)
+        candidates = candidates[np.argsort(variances.ravel()[candidates], kind="stable")]
+        if foundation != "flatten" and footprint == footprints[-1]:
+            rough = np.flatnonzero(np.isfinite(variances.ravel()) & (variances.ravel() >= variance_threshold))
+            rough = rough[np.argsort(window_range(heightmap, pad).ravel()[rough], kind="stable")]
+            candidates = np.concatenate([candidates, rough])
+
+        blocked = np.zeros(variances.shape, dtype=bool)
+        for start, placed in chosen:
+            _block_window_starts(blocked, start, placed, pad, spacing)
+        for index in candidates:
+            x, z = divmod(int(index), variances.shape[1])
+            if blocked[x, z]:
+                continue
+            plots.append(((buildRect.begin.x + x, buildRect.begin.y + z), float(variances[x, z]), footprint))
+            if len(plots) == house_count:
+                break
+            chosen.append(((x, z), pad))
+            _block_window_starts(blocked, (x, z), pad, pad, spacing)
+    return plots
+
+
+#Function which marks in blocked the window starts of window_size that would overlap, or come within
+#spacing of, a plot of plot_size starting at start
+def _block_window_starts(blocked, start, plot_size, window_size, spacing):
+    x, z = start
+    blocked[max(0, x - window_size[0] - spacing + 1):x + plot_size[0] + spacing,
+            max(0, z - window_size[1] - spacing + 1):z + plot_size[1] + spacing] = True
+
+
+#Function which sorts window indices by their int32 score, then by index, in place.
+#Each index becomes an int64 key with the score in the high half, so no argsort index array or
+#gathered score array the size of the candidates is needed. Keys are built a block at a time.
+def _rank_compact(candidates, scores, block=1 << 16):
+    for begin in range(0, len(candidates), block):
+        keys = candidates[begin:begin + block]
+        keys |= scores[keys].astype(np.int64) << 32
+    candidates.sort()
+    candidates &= 0xFFFFFFFF
+    return candidates
+
+
+#Function which flattens every plot and builds a cabin on it, drawing plot i's choices from task_rng(seed, i)
+#footprint and wall_height fix every cabin's size, see choose_cabin_design, foundation is as for plan_site
+#footprints, when given, holds each plot's own footprint (see plan_largest_settlement), built on its own pad
+#Returns a list of (plot, base_height, design) for the cabins that were built
+def build_settlement(editor, buildRect, heightmap, heightmap_leaves, plots, area_size=(15, 15), seed=0, variant_cache=None, terrain_updates=True,
+                     footprint=None, wall_height=None, foundation="flatten", footprints=None):
+    if variant_cache is None:
+        variant_cache = VariantCache()
+    built = []
+    for index, (optimal_spot, _) in enumerate(plots):
+        plot_footprint, plot_area = plot_size(index, footprints, footprint, area_size)
+        wood_choice, design, plan = plan_cabin_site(buildRect, heightmap, heightmap_leaves, optimal_spot, task_rng(seed, index), plot_area,
+                                                    plot_footprint, wall_height, foundation)
+        with terrain_edits(editor, terrain_updates):
+            base_height, _ = build_site(editor, buildRect, heightmap, heightmap_leaves, optimal_spot, plan, wood_choice, plot_area)
+        pad_origin = (optimal_spot[0], base_height + 1, optimal_spot[1])
+        variant_cache.get(design).write(editor, cabin_origin(design, pad_origin))
+        built.append((optimal_spot, base_height, design))
+    return built
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+from gdpc import Rect, interface
+
+from log_cabin.terrain import water_mask_from_world_slice
+
+#On-disk cache of what the analysis reads from a world slice: the four heightmaps and the water mask.
+#Entries are keyed by the world (host and dimension, or the offline world) and the rect, and stored
+#as one .npy file that is memory-mapped back in, so a warm run skips loadWorldSlice entirely. Rasters
+#derived from an entry are kept next to it. Chunks the generator writes to are marked stale in every
+#entry that holds them, and only those chunks are loaded again on the next run. Anything else that
+#changed the area, another save on the same server or edits made in game, is caught by fetching the
+#build area's WORLD_SURFACE heightmap in one request and comparing it with the entry: chunks where
+#they differ are loaded again too.
+#Entries are evicted least recently used first once the cache is over max_bytes.
+
+#Bump when the stored layers, or the rasters derived from them, change so old entries are not reused
+CACHE_VERSION = 2
+
+HEIGHTMAP_TYPES = ("MOTION_BLOCKING", "MOTION_BLOCKING_NO_LEAVES", "OCEAN_FLOOR", "WORLD_SURFACE")
+CHUNK_SIZE = 16
+
+
+#Function which returns the (heightmaps, water mask) layers of a world slice as one int32 array
+def slice_layers(worldSlice):
+    heightmaps = worldSlice.heightmaps
+    layers = [heightmaps[name] for name in HEIGHTMAP_TYPES]
+    layers.append(water_mask_from_world_slice(worldSlice, heightmaps["MOTION_BLOCKING_NO_LEAVES"]))
+    return np.stack(layers).astype(np.int32)
+
+
+#Function which returns the chunks a rect overlaps, as (chunk x, chunk z) pairs
+def rect_chunks(rect):
+    return {
+        (chunk_x, chunk_z)
+        for chunk_x in range(rect.begin.x >> 4, ((rect.end.x - 1) >> 4) + 1)
+        for chunk_z in range(rect.begin.y >> 4, ((rect.end.y - 1) >> 4) + 1)
+    }
+
+
+#Function which fetches the build area's WORLD_SURFACE heightmap with a single request, the fingerprint
+#cached entries are checked against
+def surface_fingerprint(editor):
+    get = getattr(editor, "getHeightmap", None)
+    if get is not None:
+        return get("WORLD_SURFACE")
+    return interface.getHeightmap(heightmapType="WORLD_SURFACE", dimension=editor.dimension, host=editor.host)
+
+
+class SliceCache:
+    def __init__(self, directory, world_id="default", max_bytes=1 << 30):
+        digest = hashlib.sha1(repr((CACHE_VERSION, world_id)).encode()).hexdigest()[:20]
+        self.directory = os.path.join(directory, f"world-{digest}")
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "chunks_reloaded": 0, "chunks_changed": 0, "evictions": 0}
+        os.makedirs(self.directory, exist_ok=True)
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._entries = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as file:
+                self._entries = json.load(file)
+
+    @staticmethod
+    def key(rect):
+        return f"{rect.begin.x}_{rect.begin.y}_{rect.size.x}_{rect.size.y}"
+
+    def entry_directory(self, rect):
+        return os.path.join(self.directory, self.key(rect))
+
+    #Function which returns the directory rasters derived from the rect's entry are kept in
+    def raster_directory(self, rect):
+        return os.path.join(self.entry_directory(rect), "rasters")
+
+    #Function which returns (heightmaps, water_mask, worldSlice) for rect, the editor's build area.
+    #worldSlice is None when the entry was read from disk, the arrays are then read-only memory maps.
+    def load(self, editor, rect):
+        key = self.key(rect)
+        path = os.path.join(self.entry_directory(rect), "slice.npy")
+        entry = self._entries.get(key)
+        worldSlice = None
+        if entry is None or not os.path.exists(path):
+            worldSlice = editor.loadWorldSlice(rect)
+            self._store(key, rect, path, slice_layers(worldSlice))
+            self.stats["misses"] += 1
+        else:
+            if entry["stale"]:
+                self._reload_chunks(editor, rect, path, entry["stale"])
+            changed = self._changed_chunks(rect, path, surface_fingerprint(editor))
+            if changed:
+                self._reload_chunks(editor, rect, path, changed)
+                self.stats["chunks_changed"] += len(changed)
+            self.stats["hits"] += 1
+        self._entries[key]["used"] = time.time()
+        self.evict(keep=key)
+
+        layers = np.load(path, mmap_mode="r")
+        heightmaps = {name: layers[index] for index, name in enumerate(HEIGHTMAP_TYPES)}
+        return heightmaps, layers[len(HEIGHTMAP_TYPES)].astype(bool), worldSlice
+
+    def _store(self, key, rect, path, layers):
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+        os.makedirs(os.path.dirname(path))
+        stored = np.lib.format.open_memmap(path, mode="w+", dtype=layers.dtype, shape=layers.shape)
+        stored[...] = layers
+        stored.flush()
+        del stored
+        self._entries[key] = {"rect": [rect.begin.x, rect.begin.y, rect.size.x, rect.size.y], "stale": [], "used": time.time()}
+
+    #Function which returns the chunks whose cached WORLD_SURFACE differs from the fingerprint, every chunk
+    #of the entry when the fingerprint does not cover rect
+    def _changed_chunks(self, rect, path, surface):
+        if tuple(surface.shape) != (rect.size.x, rect.size.y):
+            return sorted(rect_chunks(rect))
+        layers = np.load(path, mmap_mode="r")
+        x, z = np.nonzero(layers[HEIGHTMAP_TYPES.index("WORLD_SURFACE")] != surface)
+        del layers
+        chunks = np.unique(np.stack([(x + rect.begin.x) >> 4, (z + rect.begin.y) >> 4], axis=1), axis=0)
+        return [tuple(chunk) for chunk in chunks.tolist()]
+
+    #Function which loads the stale chunks of an entry again, with one slice covering all of them,
+    #and writes them into it in place. Rasters derived from the entry no longer hold, so they are dropped.
+    def _reload_chunks(self, editor, rect, path, stale):
+        chunk_x = [chunk[0] for chunk in stale]
+        chunk_z = [chunk[1] for chunk in stale]
+        begin = (max(rect.begin.x, min(chunk_x) * CHUNK_SIZE), max(rect.begin.y, min(chunk_z) * CHUNK_SIZE))
+        end = (min(rect.end.x, (max(chunk_x) + 1) * CHUNK_SIZE), min(rect.end.y, (max(chunk_z) + 1) * CHUNK_SIZE))
+        fresh = slice_layers(editor.loadWorldSlice(Rect(begin, (end[0] - begin[0], end[1] - begin[1]))))
+
+        layers = np.load(path, mmap_mode="r+")
+        for chunk in stale:
+            x = (max(begin[0], chunk[0] * CHUNK_SIZE), min(end[0], (chunk[0] + 1) * CHUNK_SIZE))
+            z = (max(begin[1], chunk[1] * CHUNK_SIZE), min(end[1], (chunk[1] + 1) * CHUNK_SIZE))
+            if x[0] >= x[1] or z[0] >= z[1]:
+                continue
+            layers[:, x[0] - rect.begin.x:x[1] - rect.begin.x, z[0] - rect.begin.y:z[1] - rect.begin.y] = \
+                fresh[:, x[0] - begin[0]:x[1] - begin[0], z[0] - begin[1]:z[1] - begin[1]]
+            self.stats["chunks_reloaded"] += 1
+        layers.flush()
+        del layers
+        shutil.rmtree(self.raster_directory(rect), ignore_errors=True)
+        self._entries[self.key(rect)]["stale"] = []
+
+    #Function which marks chunks the generator wrote to as stale in every entry that holds them
+    def invalidate(self, chunks):
+        chunks = set(chunks)
+        for entry in self._entries.values():
+            held = rect_chunks(Rect(entry["rect"][:2], entry["rect"][2:])) & chunks
+            if held:
+                entry["stale"] = sorted(set(map(tuple, entry["stale"])) | held)
+        self._write_index()
+
+    #Function which removes least recently used entries until the cache fits in max_bytes
+    def evict(self, keep=None):
+        sizes = {key: _directory_size(os.path.join(self.directory, key)) for key in self._entries}
+        total = sum(sizes.values())
+        for key in sorted(self._entries, key=lambda key: self._entries[key]["used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+            del self._entries[key]
+            total -= sizes[key]
+            self.stats["evictions"] += 1
+        self._write_index()
+
+    def _write_index(self):
+        with open(self._index_path, "w") as file:
+            json.dump(self._entries, file)
+
+
+def _directory_size(directory):
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
@@ -0,0 +1,57 @@
+import numpy as np
+
+from log_cabin.palette import block_from_key, block_key
+from log_cabin.pipeline import chunk_order, terrain_edits
+
+#Snapshot of the blocks a build overwrites, so the build can be rolled back.
+#The write pipeline captures each block's state the first time the build writes to it, before the new
+#block is recorded. The state is read from the pipeline's local world model, which holds the world
+#slices already loaded, and only blocks outside every slice are read from the server. Only written
+#blocks are kept, so a snapshot grows with the edited volume, not with the build area.
+#On disk it is palette-compressed: each block's position, its index in the snapshot's palette and the
+#palette of block state keys. Block entity data (chest contents, sign text) is not kept.
+
+
+class Snapshot:
+    def __init__(self):
+        self._original = {}
+
+    def __len__(self):
+        return len(self._original)
+
+    def __contains__(self, position):
+        return position in self._original
+
+    #Function which keeps the block a position held before it was first written, later captures leave it
+    def capture(self, position, block):
+        self._original.setdefault(position, block)
+
+    def save(self, path):
+        positions = sorted(self._original, key=chunk_order)
+        palette, indices = np.unique([block_key(self._original[position]) for position in positions], return_inverse=True)
+        np.savez_compressed(path, positions=np.array(positions, dtype=np.int32).reshape(-1, 3),
+                            indices=indices.astype(np.uint16 if len(palette) <= 1 << 16 else np.uint32), palette=palette)
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as data:
+            palette = [block_from_key(str(key)) for key in data["palette"]]
+            positions, indices = data["positions"].tolist(), data["indices"].tolist()
+        snapshot = Snapshot()
+        for position, index in zip(map(tuple, positions), indices):
+            snapshot.capture(position, palette[index])
+        return snapshot
+
+    #Function which writes every captured block back, without neighbour updates so the blocks come back
+    #exactly as they were. Through a WritePipeline the writes are batched by chunk like any other build.
+    #Returns the number of blocks restored, once they are all in the world.
+    def restore(self, editor):
+        blocks = {}
+        for position, block in self._original.items():
+            blocks.setdefault(block_key(block), (block, []))[1].append(position)
+        with terrain_edits(editor, False):
+            for block, positions in blocks.values():
+                editor.placeBlockGlobal(positions, block)
+        editor.flushBuffer()
+        editor.awaitBufferFlushes()
+        return len(self._original)
@@ -0,0 +1,164 @@
+import gzip
+import io
+
+import numpy as np
+from gdpc import Block, interface
+from nbt.nbt import NBTFile, TAG_Compound, TAG_Int, TAG_List, TAG_String
+
+from log_cabin.blueprint import Blueprint
+from log_cabin.flatten import plan_flatten_spans
+from log_cabin.palette import namespaced
+
+#Minecraft structure files (the format structure blocks and GDMC-HTTP's /structure endpoint use).
+#A blueprint becomes one structure: its palette, and one entry per placed voxel. Voxels the
+#blueprint leaves alone are left out, so placing the structure does not touch those blocks.
+#A whole site, flattened pad and cabin, can be baked offline and placed with a single request.
+
+#Minecraft 1.20.2, the version gdpc 8 and GDMC-HTTP 1.4 target
+DATA_VERSION = 3578
+
+
+def _int_list(name, values):
+    tag = TAG_List(name=name, type=TAG_Int)
+    tag.tags.extend(TAG_Int(int(value)) for value in values)
+    return tag
+
+
+#Function which converts a blueprint to a structure NBT tree, with voxel [0, 0, 0] at the structure origin
+def structure_nbt(blueprint, data_version=DATA_VERSION):
+    structure = NBTFile()
+    structure.name = ""
+    structure.tags.append(TAG_Int(name="DataVersion", value=data_version))
+    structure.tags.append(_int_list("size", blueprint.voxels.shape))
+
+    used = np.unique(blueprint.voxels)
+    used = used[used != 0]
+    palette = TAG_List(name="palette", type=TAG_Compound)
+    for index in used:
+        block = blueprint.palette[index]
+        entry = TAG_Compound()
+        entry.tags.append(TAG_String(name="Name", value=namespaced(block.id)))
+        if block.states:
+            properties = TAG_Compound(name="Properties")
+            properties.tags.extend(TAG_String(name=key, value=str(value)) for key, value in sorted(block.states.items()))
+            entry.tags.append(properties)
+        palette.tags.append(entry)
+    state_of = np.zeros(len(blueprint.palette), dtype=np.int64)
+    state_of[used] = np.arange(len(used))
+
+    blocks = TAG_List(name="blocks", type=TAG_Compound)
+    for x, y, z in zip(*(axis.tolist() for axis in np.nonzero(blueprint.voxels))):
+        entry = TAG_Compound()
+        entry.tags.append(TAG_Int(name="state", value=int(state_of[blueprint.voxels[x, y, z]])))
+        entry.tags.append(_int_list("pos", (x, y, z)))
+        blocks.tags.append(entry)
+    structure.tags.append(palette)
+    structure.tags.append(blocks)
+    structure.tags.append(TAG_List(name="entities", type=TAG_Compound))
+    return structure
+
+
+#Function which returns the gzipped structure file bytes, as Minecraft writes them
+def structure_bytes(blueprint, data_version=DATA_VERSION):
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as file:
+        structure_nbt(blueprint, data_version).write_file(buffer=file)
+    return buffer.getvalue()
+
+
+#Function which reads structure bytes, gzipped or not, back into a blueprint with its origin at voxel [0, 0, 0]
+def blueprint_from_structure(data):
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    structure = NBTFile(buffer=io.BytesIO(data))
+    blueprint = Blueprint([tag.value for tag in structure["size"].tags])
+    states = []
+    for entry in structure["palette"].tags:
+        properties = {tag.name: tag.value for tag in entry["Properties"].tags} if "Properties" in entry else {}
+        states.append(blueprint.palette_id(Block(entry["Name"].value, properties)))
+    for entry in structure["blocks"].tags:
+        blueprint.voxels[tuple(tag.value for tag in entry["pos"].tags)] = states[entry["state"].value]
+    return blueprint
+
+
+def save_structure(blueprint, path):
+    with open(path, "wb") as file:
+        file.write(structure_bytes(blueprint))
+
+
+def load_structure(path):
+    with open(path, "rb") as file:
+        return blueprint_from_structure(file.read())
+
+
+#Function which bakes a whole site into one blueprint in global co-ordinates: the flattening spans,
+#the wooden floor and, when given, the cabin written at cabin_position on top of them.
+#plan is a site plan (see log_cabin.foundation) to bake instead of flattening the pad.
+#Returns the blueprint and the floor height.
+def site_blueprint(buildRect, heightmap, heightmap_leaves, optimal_coords, wood_choice, cabin=None, cabin_position=None,
+                   area_size=(15, 15), plan=None):
+    if plan is None:
+        average_height, spans = plan_flatten_spans(buildRect, heightmap, heightmap_leaves, optimal_coords, area_size)
+        (floor_x, floor_z), floor_size = optimal_coords, area_size
+    else:
+        average_height, spans = plan["base_height"], plan["spans"]
+        (floor_x, floor_z), floor_size = plan["floor"]
+    low = [floor_x, average_height, floor_z]
+    high = [floor_x + floor_size[0], average_height + 1, floor_z + floor_size[1]]
+    for _, _, _, y_begin, y_end, _ in spans:
+        low[1] = min(low[1], y_begin)
+        high[1] = max(high[1], y_end)
+    if cabin is not None:
+        for axis in range(3):
+            low[axis] = min(low[axis], cabin_position[axis] + cabin.offset[axis])
+            high[axis] = max(high[axis], cabin_position[axis] + cabin.offset[axis] + cabin.voxels.shape[axis])
+
+    site = Blueprint([high[axis] - low[axis] for axis in range(3)], low)
+    site.begin_stage("terrain")
+    for x, z, z_size, y_begin, y_end, block_id in spans:
+        site.fill((x, y_begin, z), (x, y_end - 1, z + z_size - 1), Block(block_id))
+    site.fill((floor_x, average_height, floor_z), (floor_x + floor_size[0] - 1, average_height, floor_z + floor_size[1] - 1), Block(wood_choice))
+
+    if cabin is not None:
+        local = np.nonzero(cabin.voxels)
+        ids = cabin.voxels[local]
+        stages = cabin.stages[local]
+        x, y, z = (local[axis] + cabin.offset[axis] + cabin_position[axis] - low[axis] for axis in range(3))
+        for index in np.unique(ids):
+            placed = ids == index
+            site.voxels[x[placed], y[placed], z[placed]] = site.palette_id(cabin.palette[index])
+        for stage in np.unique(stages):
+            site.begin_stage(cabin.stage_names[stage])
+            placed = stages == stage
+            site.stages[x[placed], y[placed], z[placed]] = site.stage_names.index(cabin.stage_names[stage])
+    return site, average_height
+
+
+#Function which places a blueprint as a single structure request, with its voxel [0, 0, 0] at
+#origin + offset. Writes still queued in the editor are sent first, so the structure lands on top.
+#Returns the number of blocks placed.
+def place_structure(editor, blueprint, origin=(0, 0, 0), do_block_updates=True):
+    position = tuple(int(origin[axis]) + blueprint.offset[axis] for axis in range(3))
+    data = structure_bytes(blueprint)
+    if hasattr(editor, "flushBuffer"):
+        editor.flushBuffer()
+    if hasattr(editor, "awaitBufferFlushes"):
+        editor.awaitBufferFlushes()
+
+    x, y, z, ids = blueprint.placements(origin)
+    if hasattr(editor, "snapshot_blocks"):
+        editor.snapshot_blocks(zip(x.tolist(), y.tolist(), z.tolist()))
+    place = getattr(editor, "placeStructure", None)
+    if place is not None:
+        place(data, position, doBlockUpdates=do_block_updates)
+    else:
+        interface.placeStructure(data, position, dimension=editor.dimension, doBlockUpdates=do_block_updates,
+                                 spawnDrops=editor.spawnDrops, timeout=editor.timeout, host=editor.host)
+        if hasattr(editor, "stats"):
+            editor.stats["block_writes"] = editor.stats.get("block_writes", 0) + len(ids)
+
+    local_world = getattr(editor, "local_world", None)
+    if local_world is not None:
+        for position, index in zip(zip(x.tolist(), y.tolist(), z.tolist()), ids.tolist()):
+            local_world.record(position, blueprint.palette[index])
+    return len(ids)
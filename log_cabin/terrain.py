@@ -0,0 +1,392 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from gdpc import Block
+
+#Terrain analysis for picking a build site.
+#Every window statistic is read from summed-area tables (integral images), so the cost of a
+#window does not depend on its size and every window position can be scored in one vectorized pass.
+
+
+#Function which builds a zero-padded summed-area table, table[i, j] holds the sum of values[:i, :j]
+#Leading axes are kept, so a stack of patches gets one table each
+def summed_area_table(values, dtype=np.int64):
+    table = np.zeros(values.shape[:-2] + (values.shape[-2] + 1, values.shape[-1] + 1), dtype=dtype)
+    np.cumsum(values, axis=-2, dtype=dtype, out=table[..., 1:, 1:])
+    np.cumsum(table[..., 1:, 1:], axis=-1, out=table[..., 1:, 1:])
+    return table
+
+
+#Function which returns the sum of every area_size window, indexed by the window's local start
+def window_sums(table, area_size):
+    size_x, size_z = area_size
+    return (table[..., size_x:, size_z:]
+            - table[..., :-size_x, size_z:]
+            - table[..., size_x:, :-size_z]
+            + table[..., :-size_x, :-size_z])
+
+
+#Function which returns the height variance of every area_size window at stride 1
+#Heights are the ground blocks (heightmap - 1), the same values the original per-window loop used
+def window_variance_map(heightmap, area_size=(15, 15)):
+    if heightmap.shape[0] < area_size[0] or heightmap.shape[1] < area_size[1]:
+        return np.empty((0, 0))
+    ground = heightmap.astype(np.int64) - 1
+    count = area_size[0] * area_size[1]
+    sums = window_sums(summed_area_table(ground), area_size)
+    square_sums = window_sums(summed_area_table(ground * ground), area_size)
+    # n * sum(y^2) - sum(y)^2 is exact in integers, so flat windows score exactly 0
+    return (count * square_sums - sums * sums) / float(count * count)
+
+
+#Compact analysis for very large areas. Heights are held as int16 and water as a bit-packed mask, and
+#window statistics are worked out a block of rows at a time in preallocated int32 buffers, so memory
+#grows by a few bytes per column instead of several full-size int64 and float64 temporaries.
+#int32 summed-area tables may wrap around, but window sums and the variance numerator
+#count * sum(y^2) - sum(y)^2 are taken modulo 2^32 and the true values fit, so they come out exact.
+
+#Window rasters get this instead of a score for windows that touch water
+NO_SITE = np.iinfo(np.int32).max
+#World heights span at most this many blocks (-64 to 320), which bounds the variance of any window
+MAX_HEIGHT_RANGE = 384
+#Peak bytes per analysed column the compact site search and settlement ranking may use, on top of
+#the caller's heightmap and water mask. benchmarks/memory.py checks the budget holds.
+COMPACT_BYTES_PER_COLUMN = 16
+
+
+#Function which returns the ground heights (heightmap - 1) as int16
+def compact_heights(heightmap):
+    heights = heightmap.astype(np.int16)
+    heights -= 1
+    return heights
+
+
+#Function which packs a column mask to one bit per column along z
+def pack_mask(mask):
+    return np.packbits(mask, axis=1)
+
+
+#Function which tells whether count^2 times the variance of an area_size window always fits in int32
+def compact_window_fits(area_size):
+    count = area_size[0] * area_size[1]
+    return count * count * (MAX_HEIGHT_RANGE * MAX_HEIGHT_RANGE // 4) < NO_SITE
+
+
+#Function which fills table[1:, 1:] with the summed-area table of values, in place
+def _fill_table(table, values):
+    np.cumsum(values, axis=0, dtype=table.dtype, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+
+
+#Function which writes the window sums of a summed-area table into out, in place
+def _window_sums_into(table, area_size, out):
+    size_x, size_z = area_size
+    np.subtract(table[size_x:, size_z:], table[:-size_x, size_z:], out=out)
+    out -= table[size_x:, :-size_z]
+    out += table[:-size_x, :-size_z]
+
+
+#Function which returns count^2 times the height variance of every area_size window, exact in int32.
+#heights are int16 ground heights, packed_water a pack_mask water mask whose windows become NO_SITE.
+#Dividing by count^2 gives the variance window_variance_map returns, so the order of windows is the same.
+def compact_variance_map(heights, area_size=(15, 15), packed_water=None, block_rows=64):
+    size_x, size_z = area_size
+    count = size_x * size_z
+    if not compact_window_fits(area_size):
+        raise ValueError(f"Windows of {count} columns are too large for int32 variance, use window_variance_map")
+    starts = (heights.shape[0] - size_x + 1, heights.shape[1] - size_z + 1)
+    if starts[0] <= 0 or starts[1] <= 0:
+        return np.empty((0, 0), dtype=np.int32)
+
+    numerators = np.empty(starts, dtype=np.int32)
+    block_rows = min(block_rows, starts[0])
+    rows = block_rows + size_x - 1
+    values = np.empty((rows, heights.shape[1]), dtype=np.int32)
+    table = np.zeros((rows + 1, heights.shape[1] + 1), dtype=np.int32)
+    sums = np.empty((block_rows, starts[1]), dtype=np.int32)
+    squares = np.empty((block_rows, starts[1]), dtype=np.int32)
+    for begin in range(0, starts[0], block_rows):
+        block = min(block_rows, starts[0] - begin)
+        used = block + size_x - 1
+        block_values, block_table = values[:used], table[:used + 1]
+        block_sums, block_squares = sums[:block], squares[:block]
+        out = numerators[begin:begin + block]
+
+        block_values[...] = heights[begin:begin + used]
+        _fill_table(block_table, block_values)
+        _window_sums_into(block_table, area_size, block_sums)
+        np.multiply(block_values, block_values, out=block_values)
+        _fill_table(block_table, block_values)
+        _window_sums_into(block_table, area_size, block_squares)
+        block_squares *= count
+        np.multiply(block_sums, block_sums, out=block_sums)
+        np.subtract(block_squares, block_sums, out=out)
+
+        if packed_water is not None:
+            block_values[...] = np.unpackbits(packed_water[begin:begin + used], axis=1, count=heights.shape[1])
+            _fill_table(block_table, block_values)
+            _window_sums_into(block_table, area_size, block_sums)
+            out[block_sums > 0] = NO_SITE
+    return numerators
+
+
+#Blocks that count as water or another liquid when they are the ground block of a column
+LIQUID_BLOCK_IDS = {
+    "minecraft:water", "minecraft:lava", "minecraft:bubble_column",
+    "minecraft:kelp", "minecraft:kelp_plant", "minecraft:seagrass", "minecraft:tall_seagrass",
+}
+
+
+def is_liquid_block(block):
+    return block.id in LIQUID_BLOCK_IDS or block.states.get("waterlogged") == "true"
+
+
+#Function which marks every column whose ground block is a liquid, using only the loaded world slice
+#MOTION_BLOCKING_NO_LEAVES counts fluids but OCEAN_FLOOR does not, so any column where the first is
+#higher has liquid on top (still or flowing). Leaves count towards OCEAN_FLOOR, so the few columns
+#under a canopy have their ground block looked up in the slice's own palettes instead.
+def water_mask_from_world_slice(worldSlice, heightmap=None):
+    heightmaps = worldSlice.heightmaps
+    if heightmap is None:
+        heightmap = heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+
+    if "OCEAN_FLOOR" in heightmaps:
+        mask = heightmap > heightmaps["OCEAN_FLOOR"]
+        unresolved = ~mask
+        if "MOTION_BLOCKING" in heightmaps:
+            unresolved &= heightmaps["MOTION_BLOCKING"] != heightmap
+    else:
+        mask = np.zeros(heightmap.shape, dtype=bool)
+        unresolved = np.ones(heightmap.shape, dtype=bool)
+
+    begin = worldSlice.rect.begin
+    for local_x, local_z in zip(*np.nonzero(unresolved)):
+        position = (begin.x + int(local_x), int(heightmap[local_x, local_z]) - 1, begin.y + int(local_z))
+        mask[local_x, local_z] = is_liquid_block(worldSlice.getBlockGlobal(position))
+    return mask
+
+
+#Function which marks every column whose ground block is still water, queried once per column
+#Each query can be an HTTP request, prefer water_mask_from_world_slice when a slice is loaded
+def water_mask_from_editor(editor, buildRect, heightmap):
+    water = Block("minecraft:water", {"level": "0"})
+    mask = np.zeros(heightmap.shape, dtype=bool)
+    for local_x in range(heightmap.shape[0]):
+        for local_z in range(heightmap.shape[1]):
+            y = heightmap[local_x, local_z] - 1
+            position = (buildRect.begin.x + local_x, y, buildRect.begin.y + local_z)
+            mask[local_x, local_z] = editor.getBlock(position) == water
+    return mask
+
+
+#Function which flags every window that contains at least one masked column
+def window_any(mask, area_size=(15, 15)):
+    return window_sums(summed_area_table(mask, dtype=np.int32), area_size) > 0
+
+
+#Function which returns the difference between the highest and lowest column of every area_size window,
+#the drop a floor level with the highest ground has over the lowest
+def window_range(heightmap, area_size=(15, 15)):
+    if heightmap.shape[0] < area_size[0] or heightmap.shape[1] < area_size[1]:
+        return np.empty((0, 0), dtype=heightmap.dtype)
+    #Separable, the extremes along z first and then along x
+    highest = sliding_window_view(heightmap, area_size[1], axis=1).max(axis=-1)
+    lowest = sliding_window_view(heightmap, area_size[1], axis=1).min(axis=-1)
+    return sliding_window_view(highest, area_size[0], axis=0).max(axis=-1) - sliding_window_view(lowest, area_size[0], axis=0).min(axis=-1)
+
+
+#Function which sums values over blocks of block_size cells, dropping the partial blocks at the far edges
+def block_sums(values, block_size):
+    blocks_x, blocks_z = values.shape[0] // block_size[0], values.shape[1] // block_size[1]
+    cropped = values[:blocks_x * block_size[0], :blocks_z * block_size[1]]
+    return cropped.reshape(blocks_x, block_size[0], blocks_z, block_size[1]).sum(axis=3).sum(axis=1)
+
+
+#Function which scores every window starting in a batch of regions at stride 1, in one vectorized pass.
+#ground and wet are padded by a block on their far sides, wet padding keeps windows off the map at inf.
+#Returns the best (variance, (x, z)) of the batch, ties going to the lowest x, then the lowest z.
+def _refine_regions(ground, wet, area_size, block_size, origins):
+    patch = (block_size[0] + area_size[0] - 1, block_size[1] + area_size[1] - 1)
+    heights = sliding_window_view(ground, patch)[origins[:, 0], origins[:, 1]]
+    count = area_size[0] * area_size[1]
+    sums = window_sums(summed_area_table(heights), area_size)
+    square_sums = window_sums(summed_area_table(heights * heights), area_size)
+    variance = (count * square_sums - sums * sums) / float(count * count)
+    wet_windows = window_sums(summed_area_table(sliding_window_view(wet, patch)[origins[:, 0], origins[:, 1]], np.int32), area_size) > 0
+    scores = np.where(wet_windows, np.inf, variance).reshape(len(origins), -1)
+
+    local = np.argmin(scores, axis=1)
+    lowest = scores[np.arange(len(origins)), local]
+    x = origins[:, 0] + local // block_size[1]
+    z = origins[:, 1] + local % block_size[1]
+    best = np.lexsort((z, x, lowest))[0]
+    return float(lowest[best]), (int(x[best]), int(z[best]))
+
+
+#Function which finds the flattest dry window coarse-to-fine, with the same result as a full stride-1 search.
+#Window starts are grouped into regions of block_size. Every window starting in a region covers the
+#same core of whole blocks, and a window's variance is at least the spread of that core about its own
+#mean divided by the window's cell count. Regions are refined at stride 1 in order of that lower bound
+#until the bound cannot beat the best window found or variance_threshold.
+#Returns the local (x, z) of the window and its variance, or (None, inf).
+def pyramid_search(heightmap, water_mask, area_size=(15, 15), variance_threshold=None, block_size=None):
+    size_x, size_z = area_size
+    starts = (heightmap.shape[0] - size_x + 1, heightmap.shape[1] - size_z + 1)
+    if starts[0] <= 0 or starts[1] <= 0:
+        return None, float('inf')
+    if block_size is None:
+        block_size = (max(1, size_x // 3), max(1, size_z // 3))
+    #Blocks per axis that sit inside every window of a region
+    core = (size_x // block_size[0] - 1, size_z // block_size[1] - 1)
+    regions = (-(-starts[0] // block_size[0]), -(-starts[1] // block_size[1]))
+
+    if min(core) < 1:
+        bounds = np.zeros(regions)
+        region_wet = np.zeros(regions, dtype=bool)
+    else:
+        #Heights stay in int32 until block totals are taken, squares of world heights fit easily
+        ground = heightmap.astype(np.int32) - 1
+        #The core of every region that has a window lies inside the map, the padding only evens out shapes
+        padded = (regions[0] + core[0] + 1, regions[1] + core[1] + 1)
+        statistics = []
+        for values in (ground, ground * ground, water_mask.view(np.uint8)):
+            blocks = block_sums(values, block_size)
+            grid = np.zeros(padded, dtype=np.int64)
+            used = (min(blocks.shape[0], padded[0]), min(blocks.shape[1], padded[1]))
+            grid[:used[0], :used[1]] = blocks[:used[0], :used[1]]
+            statistics.append(window_sums(summed_area_table(grid), core)[1:regions[0] + 1, 1:regions[1] + 1])
+        sums, square_sums, wet = statistics
+        count = core[0] * block_size[0] * core[1] * block_size[1]
+        #The core's spread is exact in integers, the float division is monotone so bounds never overshoot
+        bounds = (count * square_sums - sums * sums) / float(count * size_x * size_z)
+        region_wet = wet > 0
+
+    keep = ~region_wet
+    if variance_threshold is not None:
+        keep &= bounds < variance_threshold
+
+    #Windows that would start past the last real one read padding, which is wet
+    pad = ((0, block_size[0]), (0, block_size[1]))
+    ground = np.pad(heightmap.astype(np.int64) - 1, pad, mode="edge")
+    wet = np.pad(water_mask, pad, constant_values=True)
+
+    def refine(regions):
+        candidate = _refine_regions(ground, wet, area_size, block_size, regions * np.array(block_size))
+        return candidate if np.isfinite(candidate[0]) else None
+
+    #The region with the lowest bound gives a first best, only regions bounded at or under it are sorted
+    best = None
+    if keep.any():
+        first = np.unravel_index(np.argmin(np.where(keep, bounds, np.inf)), bounds.shape)
+        best = refine(np.array([first]))
+        if best is not None:
+            keep &= bounds <= best[0]
+
+    #Regions come sorted by (bound, x, z) and are refined in growing batches. Once a region's bound and
+    #origin cannot beat the best, neither can any region after it.
+    region_x, region_z = np.nonzero(keep)
+    order = np.lexsort((region_z, region_x, bounds[region_x, region_z]))
+    regions = np.stack([region_x[order], region_z[order]], axis=1)
+    position = 0
+    batch = 16
+    while position < len(regions):
+        region = regions[position]
+        origin = (int(region[0]) * block_size[0], int(region[1]) * block_size[1])
+        if best is not None and (float(bounds[region[0], region[1]]), origin) > best:
+            break
+        candidate = refine(regions[position:position + batch])
+        if candidate is not None and (best is None or candidate < best):
+            best = candidate
+        position += batch
+        batch = min(batch * 2, 1024)
+
+    if best is None or (variance_threshold is not None and best[0] >= variance_threshold):
+        return None, float('inf')
+    return best[1], best[0]
+
+
+#Function which finds and returns the co-ordinates for the most optimal area found
+#Every window is scored from the summed-area tables, so step_size=1 (a full search) is cheap.
+#pyramid=True gives the same answer as step_size=1 but only scores regions that could hold the best
+#window. With variance_threshold it also skips regions that cannot get under it, and reports
+#(None, inf) when no window does. compact=True also gives the same answer, within the
+#COMPACT_BYTES_PER_COLUMN memory budget.
+def find_optimal_building_spot(editor, buildRect, heightmap, area_size=(15, 15), step_size=1, water_mask=None,
+                               pyramid=False, variance_threshold=None, compact=False):
+    if water_mask is None:
+        if editor.worldSlice is not None and editor.worldSlice.rect == buildRect:
+            water_mask = water_mask_from_world_slice(editor.worldSlice, heightmap)
+        else:
+            water_mask = water_mask_from_editor(editor, buildRect, heightmap)
+
+    if pyramid:
+        best, lowest_variance = pyramid_search(heightmap, water_mask, area_size, variance_threshold)
+        if best is None:
+            return None, float('inf')
+        return (buildRect.begin.x + best[0], buildRect.begin.y + best[1]), lowest_variance
+
+    if compact:
+        numerators = compact_variance_map(compact_heights(heightmap), area_size, pack_mask(water_mask))[::step_size, ::step_size]
+        if numerators.size == 0:
+            return None, float('inf')
+        best = np.unravel_index(np.argmin(numerators), numerators.shape)
+        if numerators[best] == NO_SITE:
+            return None, float('inf')
+        count = area_size[0] * area_size[1]
+        optimal_coords = (buildRect.begin.x + int(best[0]) * step_size, buildRect.begin.y + int(best[1]) * step_size)
+        return optimal_coords, int(numerators[best]) / float(count * count)
+
+    variance_map = window_variance_map(heightmap, area_size)
+    if variance_map.size == 0:
+        return None, float('inf')
+    scores = np.where(window_any(water_mask, area_size), np.inf, variance_map)
+
+    # Keep the original scan grid for larger steps
+    scores = scores[::step_size, ::step_size]
+    best = np.unravel_index(np.argmin(scores), scores.shape)
+    lowest_variance = float(scores[best])
+    if not np.isfinite(lowest_variance):
+        return None, float('inf')
+
+    optimal_coords = (buildRect.begin.x + int(best[0]) * step_size, buildRect.begin.y + int(best[1]) * step_size)
+    return optimal_coords, lowest_variance
+
+
+#Function which scores several window sizes from one set of summed-area tables: the tables of heights,
+#squared heights and water are built once and every size reads its window sums from them.
+#Yields the variance map of each size in turn, with inf for windows that touch water, indexed by the
+#window's local start like window_variance_map. Maps are made as they are asked for, so a caller can stop early.
+def multi_size_variance_maps(heightmap, water_mask, sizes):
+    ground = heightmap.astype(np.int64) - 1
+    sums_table = summed_area_table(ground)
+    squares_table = summed_area_table(ground * ground)
+    water_table = summed_area_table(water_mask, np.int32)
+    for area_size in sizes:
+        if heightmap.shape[0] < area_size[0] or heightmap.shape[1] < area_size[1]:
+            yield np.empty((0, 0))
+            continue
+        count = area_size[0] * area_size[1]
+        sums = window_sums(sums_table, area_size)
+        variance = (count * window_sums(squares_table, area_size) - sums * sums) / float(count * count)
+        variance[window_sums(water_table, area_size) > 0] = np.inf
+        yield variance
+
+
+#Function which finds the site for the largest window size that fits anywhere in the build area: the
+#flattest dry window of that size under variance_threshold. Sizes are tried largest area first and share
+#one set of summed-area tables, so the terrain is only summed once however many sizes there are.
+#Returns the global (x, z), the index into sizes and the variance, or (None, None, inf).
+def find_largest_building_spot(buildRect, heightmap, water_mask, sizes, variance_threshold):
+    order = sorted(range(len(sizes)), key=lambda index: sizes[index][0] * sizes[index][1], reverse=True)
+    for index, variance in zip(order, multi_size_variance_maps(heightmap, water_mask, [sizes[index] for index in order])):
+        if variance.size == 0:
+            continue
+        best = np.unravel_index(np.argmin(variance), variance.shape)
+        if variance[best] < variance_threshold:
+            return (buildRect.begin.x + int(best[0]), buildRect.begin.y + int(best[1])), index, float(variance[best])
+    return None, None, float('inf')
+
+
+#function to generate variance data for plotting, indexed [x, z] like the heightmap
+#TerrainRasters keeps this and the other rasters cached for a whole run
+def generate_variance_map(buildRect, heightmap, step_size=15, area_size=(15, 15)):
+    return window_variance_map(heightmap, area_size)[::step_size, ::step_size]
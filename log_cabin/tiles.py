@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from gdpc import Rect
+
+from log_cabin.terrain import water_mask_from_world_slice, window_any, window_variance_map
+
+#Tiled terrain analysis for build areas too big to load as one world slice.
+#The build rect is cut into chunk-aligned tiles. Each tile is loaded with a halo of area_size - 1
+#extra columns on its +x and +z sides, so every window that starts inside the tile is complete.
+#The next tile is fetched on a background thread while the current one is scored, and at most two
+#tiles are held at once, so peak memory depends on the tile size and not the build area.
+
+CHUNK_SIZE = 16
+
+
+#Function which yields (core, loaded) rects covering buildRect
+#Window starts in core are scored from the loaded rect, tile edges sit on multiples of tile_size
+def tile_rects(buildRect, tile_size=256, halo=(14, 14)):
+    tile_size = -(-tile_size // CHUNK_SIZE) * CHUNK_SIZE
+    begin, end = buildRect.begin, buildRect.end
+    for tile_x in range(begin.x // tile_size * tile_size, end.x, tile_size):
+        for tile_z in range(begin.y // tile_size * tile_size, end.y, tile_size):
+            core_begin = (max(begin.x, tile_x), max(begin.y, tile_z))
+            core_end = (min(end.x, tile_x + tile_size), min(end.y, tile_z + tile_size))
+            loaded_end = (min(end.x, core_end[0] + halo[0]), min(end.y, core_end[1] + halo[1]))
+            core = Rect(core_begin, (core_end[0] - core_begin[0], core_end[1] - core_begin[1]))
+            loaded = Rect(core_begin, (loaded_end[0] - core_begin[0], loaded_end[1] - core_begin[1]))
+            yield core, loaded
+
+
+#Function which loads a world slice for each rect in turn, fetching the next one in the background
+def stream_world_slices(editor, rects, heightmapTypes=None, prefetch=True):
+    rects = iter(rects)
+    if not prefetch:
+        for rect in rects:
+            yield rect, editor.loadWorldSlice(rect, heightmapTypes)
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        rect = next(rects, None)
+        pending = None if rect is None else executor.submit(editor.loadWorldSlice, rect, heightmapTypes)
+        while pending is not None:
+            worldSlice = pending.result()
+            current = rect
+            rect = next(rects, None)
+            pending = None if rect is None else executor.submit(editor.loadWorldSlice, rect, heightmapTypes)
+            yield current, worldSlice
+            del worldSlice
+
+
+#Function which yields (core, variance, wet) for every tile, where variance and wet hold the scores
+#of the windows starting in core, indexed [x, z] from core.begin
+def analyse_tiles(editor, buildRect, area_size=(15, 15), tile_size=256, prefetch=True):
+    halo = (area_size[0] - 1, area_size[1] - 1)
+    tiles = list(tile_rects(buildRect, tile_size, halo))
+    slices = stream_world_slices(editor, [loaded for _, loaded in tiles], prefetch=prefetch)
+    for (core, _), (_, worldSlice) in zip(tiles, slices):
+        heightmap = worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+        variance = window_variance_map(heightmap, area_size)
+        if variance.size == 0:
+            continue
+        wet = window_any(water_mask_from_world_slice(worldSlice, heightmap), area_size)
+        yield core, variance[:core.size.x, :core.size.y], wet[:core.size.x, :core.size.y]
+
+
+#Function which finds the flattest dry window tile by tile, giving the same answer as
+#find_optimal_building_spot over the whole area: ties go to the lowest x, then the lowest z
+def find_optimal_building_spot_tiled(editor, buildRect, area_size=(15, 15), tile_size=256, prefetch=True):
+    best = None
+    for core, variance, wet in analyse_tiles(editor, buildRect, area_size, tile_size, prefetch):
+        scores = np.where(wet, np.inf, variance)
+        local = np.unravel_index(np.argmin(scores), scores.shape)
+        candidate = (float(scores[local]), (core.begin.x + int(local[0]), core.begin.y + int(local[1])))
+        if np.isfinite(candidate[0]) and (best is None or candidate < best):
+            best = candidate
+    if best is None:
+        return None, float('inf')
+    return best[1], best[0]
@@ -0,0 +1,97 @@
+import hashlib
+import itertools
+import os
+import tempfile
+from collections import OrderedDict
+
+from log_cabin.blueprint import Blueprint
+from log_cabin.cabin import (
+    BED_COLOUR_OPTIONS, LENGTH_OPTIONS, PLATEAU_OPTIONS, ROOF_OPTIONS, WALL_HEIGHT_OPTIONS, WIDTH,
+    CabinDesign, build_cabin_blueprint, check_cabin_size,
+)
+
+#Cache of compiled cabin blueprints keyed by the design's structural parameters.
+#Where a cabin sits on its pad does not change its blueprint, so the offset is left out of the key
+#and instantiating a cached variant is a lookup plus a translated write.
+
+#Bump when build_cabin_blueprint changes so old files on disk are not reused
+CACHE_VERSION = 2
+
+
+#Function which returns the part of a design that decides its blueprint
+def structural_key(design):
+    return design._replace(offset=(0, 0))
+
+
+class VariantCache:
+    def __init__(self, directory=None, max_entries=128):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._blueprints = OrderedDict()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._blueprints)
+
+    def path(self, key):
+        digest = hashlib.sha1(repr((CACHE_VERSION, tuple(key))).encode()).hexdigest()[:20]
+        return os.path.join(self.directory, f"cabin-{digest}.npz")
+
+    #Function which returns the blueprint for a design, shared between callers so it must not be edited
+    def get(self, design):
+        key = structural_key(design)
+        blueprint = self._blueprints.get(key)
+        if blueprint is not None:
+            self._blueprints.move_to_end(key)
+            self.stats["hits"] += 1
+            return blueprint
+
+        if self.directory is not None and os.path.exists(self.path(key)):
+            blueprint = Blueprint.load(self.path(key))
+            self.stats["disk_hits"] += 1
+        else:
+            blueprint = build_cabin_blueprint(key)
+            self.stats["misses"] += 1
+            if self.directory is not None:
+                self._save(key, blueprint)
+
+        self._blueprints[key] = blueprint
+        if len(self._blueprints) > self.max_entries:
+            self._blueprints.popitem(last=False)
+        return blueprint
+
+    def _save(self, key, blueprint):
+        #Write to a temporary file first so a crash never leaves half a variant behind
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".npz")
+        with os.fdopen(handle, "wb") as file:
+            blueprint.save(file)
+        os.replace(temporary, self.path(key))
+
+    def warm(self, designs):
+        for design in designs:
+            self.get(design)
+
+
+#Function which yields every structural variant the generator can produce for the given cabin sizes, as
+#choose_cabin_design draws them: footprints is a list of (length, width), wall_heights a list of heights.
+#By default these are the sizes drawn when neither is fixed, LENGTH_OPTIONS by WIDTH and WALL_HEIGHT_OPTIONS.
+#The furniture permutations make this a few hundred thousand designs, so slice it before warming
+def structural_variants(footprints=None, wall_heights=None):
+    if footprints is None:
+        footprints = [(length, WIDTH) for length in LENGTH_OPTIONS]
+    if wall_heights is None:
+        wall_heights = WALL_HEIGHT_OPTIONS
+    for footprint in footprints:
+        check_cabin_size(footprint)
+    for wall_height in wall_heights:
+        check_cabin_size(wall_height=wall_height)
+    for orientation, (length, width), wall_height, roof_type, plateau, bed_colour, bed_at_start in itertools.product(
+            [True, False], footprints, wall_heights, ROOF_OPTIONS, PLATEAU_OPTIONS,
+            BED_COLOUR_OPTIONS, [True, False]):
+        positions = range(2, width - 1)
+        for lantern in positions:
+            for furniture in itertools.permutations(positions, 3):
+                yield CabinDesign(orientation, length, width, wall_height, (0, 0), roof_type, plateau,
+                                  lantern, bed_colour, bed_at_start, furniture)
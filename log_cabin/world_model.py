@@ -0,0 +1,36 @@
+#Local model of the world the generator is editing.
+#It is seeded from world slices that are already loaded and records every block placed after that,
+#so later phases can read the world without asking the server again. Placements outside every
+#slice are remembered too, as nothing but this generator writes to the build area while it runs.
+#Changes the server makes on its own, such as falling sand or flowing water after a block update,
+#are not seen.
+
+
+class LocalWorld:
+    def __init__(self, worldSlice=None):
+        self._slices = []
+        self._placed = {}
+        if worldSlice is not None:
+            self.add_slice(worldSlice)
+
+    #Function which seeds the model with a slice, newer slices are read before older ones
+    def add_slice(self, worldSlice):
+        self._slices.insert(0, worldSlice)
+
+    def record(self, position, block):
+        self._placed[(int(position[0]), int(position[1]), int(position[2]))] = block
+
+    #Function which returns the block at a global position, or None when the model does not know it
+    def getBlockGlobal(self, position):
+        position = (int(position[0]), int(position[1]), int(position[2]))
+        block = self._placed.get(position)
+        if block is not None:
+            return block
+        for worldSlice in self._slices:
+            if worldSlice.box.contains(position):
+                return worldSlice.getBlockGlobal(position)
+        return None
+
+    #Function which returns the (chunk x, chunk z) of every chunk a block was placed in
+    def modified_chunks(self):
+        return {(x >> 4, z >> 4) for x, _, z in self._placed}
@@ -0,0 +1,26 @@
+#The edit raster the site search ranks by has to match what flattening actually writes.
+#Run from the repository root with: python -m pytest tests
+import random
+
+from log_cabin.flatten import flatten_plan, surface_top, window_flatten_edits
+from log_cabin.mock import MockEditor, generate_world
+
+AREA_SIZE = (15, 15)
+
+
+def test_edit_raster_matches_flatten_plan_with_grass():
+    editor = MockEditor(generate_world((64, 64), seed=1))
+    worldSlice = editor.loadWorldSlice()
+    heightmaps = worldSlice.heightmaps
+    heightmap = heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+    top = surface_top(heightmaps)
+    #Grass and flowers stand above the motion blocking top in this world
+    assert (heightmaps["WORLD_SURFACE"] > heightmaps["MOTION_BLOCKING"]).any()
+
+    levels, air, dirt = window_flatten_edits(heightmap, top, AREA_SIZE)
+    rng = random.Random(0)
+    windows = [(rng.randrange(levels.shape[0]), rng.randrange(levels.shape[1])) for _ in range(200)]
+    for x, z in windows:
+        plan = flatten_plan(worldSlice.rect, heightmap, top, (worldSlice.rect.begin.x + x, worldSlice.rect.begin.y + z), AREA_SIZE)
+        assert levels[x, z] == plan["base_height"]
+        assert (air[x, z], dirt[x, z]) == (plan["air_blocks"], plan["dirt_blocks"])
@@ -0,0 +1,25 @@
+#A raised floor clears what stands over its footprint, plants on the highest ground included.
+#Run from the repository root with: python -m pytest tests
+import random
+
+import numpy as np
+
+from log_cabin.flatten import surface_top
+from log_cabin.foundation import build_site, plan_cabin_site
+from log_cabin.mock import AIR_IDS, MockEditor, generate_world
+
+
+def test_raised_floor_leaves_nothing_above_it():
+    editor = MockEditor(generate_world((64, 64), seed=1))
+    worldSlice = editor.loadWorldSlice()
+    heightmap = worldSlice.heightmaps["MOTION_BLOCKING_NO_LEAVES"]
+    top = surface_top(worldSlice.heightmaps)
+    for site in [(4, 4), (20, 30), (40, 12)]:
+        wood, design, plan = plan_cabin_site(worldSlice.rect, heightmap, top, site, random.Random(0), foundation="raised")
+        base_height, _ = build_site(editor, worldSlice.rect, heightmap, top, site, plan, wood)
+        editor.flushBuffer()
+        (floor_x, floor_z), floor_size = plan["floor"]
+        for x in range(floor_x, floor_x + floor_size[0]):
+            for z in range(floor_z, floor_z + floor_size[1]):
+                above = [editor.getBlockGlobal((x, y, z)).id for y in range(base_height + 1, int(np.max(top)) + 1)]
+                assert all(block_id in AIR_IDS for block_id in above), (x, z, above)
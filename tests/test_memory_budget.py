@@ -0,0 +1,23 @@
+#The compact analysis has to stay within COMPACT_BYTES_PER_COLUMN, on rough terrain and on flat terrain
+#where every window is a settlement candidate. benchmarks.memory measures the same at larger sizes.
+#Run from the repository root with: python -m pytest tests
+import pytest
+from gdpc import Rect
+
+from benchmarks.memory import peak_memory, terrains
+from log_cabin.settlement import plan_settlement
+from log_cabin.terrain import COMPACT_BYTES_PER_COLUMN, find_optimal_building_spot
+
+SIZE = 1024
+
+
+@pytest.mark.parametrize("terrain", ["synthetic", "flat"])
+@pytest.mark.parametrize("phase", ["search", "settlement"])
+def test_compact_analysis_stays_within_budget(terrain, phase):
+    heightmap, water_mask = next((heightmap, water_mask) for name, heightmap, water_mask in terrains(SIZE, 0) if name == terrain)
+    buildRect = Rect((0, 0), (SIZE, SIZE))
+    if phase == "search":
+        peak, _ = peak_memory(find_optimal_building_spot, None, buildRect, heightmap, water_mask=water_mask, compact=True)
+    else:
+        peak, _ = peak_memory(plan_settlement, buildRect, heightmap, water_mask, 20, compact=True)
+    assert peak / (SIZE * SIZE) <= COMPACT_BYTES_PER_COLUMN
@@ -0,0 +1,20 @@
+#A write is skipped when the block is already there, however its id is spelled.
+#Run from the repository root with: python -m pytest tests
+from gdpc import Block
+
+from log_cabin.mock import MockEditor, generate_world
+from log_cabin.pipeline import WritePipeline
+
+
+def test_unnamespaced_block_over_the_same_block_is_skipped():
+    mock = MockEditor(generate_world((32, 32), seed=1), buffering=True)
+    for x in range(4):
+        mock.world.set((x, 100, 0), Block("minecraft:spruce_planks"))
+    editor = WritePipeline(mock)
+    editor.local_world.add_slice(editor.loadWorldSlice(editor.getBuildArea().toRect()))
+    for x in range(4):
+        editor.placeBlockGlobal((x, 100, 0), Block("spruce_planks"))
+    editor.placeBlockGlobal((0, 101, 0), Block("spruce_planks"))
+    editor.close()
+    assert editor.stats["skipped_writes"] == 4
+    assert mock.stats["block_writes"] == 1
@@ -0,0 +1,29 @@
+#Settlements with several footprints give each plot the largest cabin that fits there, without overlaps.
+#Run from the repository root with: python -m pytest tests
+import numpy as np
+from gdpc import Rect
+
+from log_cabin.cabin import footprint_pad
+from log_cabin.settlement import plan_largest_settlement
+
+
+def test_largest_footprint_fills_big_gaps_and_small_ones_fill_the_rest():
+    #A flat 20x60 field, too narrow for a second 11x13 pad beside the first
+    heightmap = np.full((20, 60), 70)
+    water_mask = np.zeros(heightmap.shape, dtype=bool)
+    footprints = [(5, 6), (11, 13)]
+    plots = plan_largest_settlement(Rect((0, 0), heightmap.shape), heightmap, water_mask, 6, footprints)
+
+    sizes = [footprint for _, _, footprint in plots]
+    assert sizes[0] == (11, 13)
+    assert sizes == sorted(sizes, key=lambda footprint: footprint[0] * footprint[1], reverse=True)
+    assert (5, 6) in sizes
+
+    #Pads stay 2 blocks apart, and inside the build area
+    pads = [(x, z, *footprint_pad(footprint)) for (x, z), _, footprint in plots]
+    for index, (x, z, length, width) in enumerate(pads):
+        assert x + length <= heightmap.shape[0] and z + width <= heightmap.shape[1]
+        for other_x, other_z, other_length, other_width in pads[index + 1:]:
+            apart_x = other_x >= x + length + 2 or x >= other_x + other_length + 2
+            apart_z = other_z >= z + width + 2 or z >= other_z + other_width + 2
+            assert apart_x or apart_z